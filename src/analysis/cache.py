@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from setting import (
+    RESULT_CACHE_DIR_PATH,
+    RESULT_CACHE_DISK_BYTES,
+    RESULT_CACHE_ENABLED,
+    RESULT_CACHE_MEMORY_BYTES,
+)
+
+# Changing the format of the cached results invalidates the old entries
+CACHE_VERSION = 5
+
+# The pickled results keyed by their content hash, least recently used first
+_memory = OrderedDict()
+_memory_bytes = 0
+# Guards the memory tier, which the threads of the server share
+_memory_lock = threading.Lock()
+
+
+def result_key(tmp: np.ndarray, time: np.ndarray, params: dict, engine: str) -> str:
+    """
+    Computes the content hash of an analysis from the temperature and time arrays,
+    the parameters normalized by categorizer._data_set and the engine,
+    so that the same recording analyzed with the same parameters is found
+    regardless of its file name.
+
+    Args:
+        tmp (numpy.ndarray): The temperature data.
+        time (numpy.ndarray): The time data.
+        params (dict): The normalized parameters.
+        engine (str): The name of the event segmentation engine.
+    Returns:
+        str: The hexadecimal hash, or None if the cache is turned off.
+    """
+    if not RESULT_CACHE_ENABLED:
+        return None
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{CACHE_VERSION}:{engine}:".encode())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    digest.update(np.ascontiguousarray(tmp, dtype=np.float64).tobytes())
+    digest.update(
+        np.ascontiguousarray(time, dtype="datetime64[s]").view(np.int64).tobytes()
+    )
+    return digest.hexdigest()
+
+
+def _cache_path(key: str) -> str:
+    """
+    Returns the path of the on-disk entry of a key.
+
+    Args:
+        key (str): The content hash.
+    Returns:
+        str: The path of the entry.
+    """
+    return os.path.join(RESULT_CACHE_DIR_PATH, f"{key}.pkl")
+
+
+def get(key: str):
+    """
+    Looks up the results in the memory tier and then in the disk tier.
+    The results found on the disk are promoted to the memory tier.
+    A copy is returned, so that the caller may modify it.
+
+    Args:
+        key (str): The content hash.
+    Returns:
+        The cached results, or None if they are not cached.
+    """
+    if key is None:
+        return None
+    with _memory_lock:
+        payload = _memory.get(key)
+        if payload is not None:
+            _memory.move_to_end(key)
+    if payload is not None:
+        return pickle.loads(payload)
+    try:
+        with open(_cache_path(key), "rb") as f:
+            payload = f.read()
+        # the modification time orders the entries for the eviction
+        os.utime(_cache_path(key))
+    except OSError:
+        return None
+    try:
+        value = pickle.loads(payload)
+    except Exception as e:
+        print(f"Broken cache entry {key}: {str(e)}")
+        # another thread may have removed or replaced it in the meantime
+        try:
+            os.remove(_cache_path(key))
+        except FileNotFoundError:
+            pass
+        return None
+    _remember(key, payload)
+    return value
+
+
+def put(key: str, value) -> None:
+    """
+    Stores the results in both tiers and evicts the least recently used entries
+    exceeding RESULT_CACHE_MEMORY_BYTES and RESULT_CACHE_DISK_BYTES.
+
+    Args:
+        key (str): The content hash.
+        value: The results to be cached.
+    """
+    if key is None:
+        return
+    payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    _remember(key, payload)
+    # the entry is written to a file of this thread and renamed, so that
+    # the readers and the other writers never see a partial entry
+    temp_path = f"{_cache_path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(RESULT_CACHE_DIR_PATH, exist_ok=True)
+        with open(temp_path, "wb") as f:
+            f.write(payload)
+        os.replace(temp_path, _cache_path(key))
+        evict_disk(RESULT_CACHE_DIR_PATH, RESULT_CACHE_DISK_BYTES, ".pkl")
+    except OSError as e:
+        print(f"Failed to write cache entry {key}: {str(e)}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _remember(key: str, payload: bytes) -> None:
+    """
+    Stores the pickled results in the memory tier.
+
+    Args:
+        key (str): The content hash.
+        payload (bytes): The pickled results.
+    """
+    global _memory_bytes
+    with _memory_lock:
+        if key in _memory:
+            _memory_bytes -= len(_memory.pop(key))
+        if len(payload) > RESULT_CACHE_MEMORY_BYTES:
+            return
+        _memory[key] = payload
+        _memory_bytes += len(payload)
+        while _memory_bytes > RESULT_CACHE_MEMORY_BYTES:
+            _, evicted = _memory.popitem(last=False)
+            _memory_bytes -= len(evicted)
+
+
+def evict_disk(dir_path: str, max_bytes: int, suffix: str) -> None:
+    """
+    Removes the least recently used entries of an on-disk cache
+    until its size is within the limit.
+
+    Args:
+        dir_path (str): The directory of the cache.
+        max_bytes (int): The size limit of the cache in bytes.
+        suffix (str): The extension of the entries.
+    """
+    with os.scandir(dir_path) as ents:
+        entries = sorted(
+            (ent.stat().st_mtime, ent.stat().st_size, ent.path)
+            for ent in ents
+            if ent.is_file() and ent.name.endswith(suffix)
+        )
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def clear() -> None:
+    """
+    Removes every entry of both tiers.
+    """
+    global _memory_bytes
+    with _memory_lock:
+        _memory.clear()
+        _memory_bytes = 0
+    if os.path.isdir(RESULT_CACHE_DIR_PATH):
+        for name in os.listdir(RESULT_CACHE_DIR_PATH):
+            os.remove(os.path.join(RESULT_CACHE_DIR_PATH, name))
@@ -1,6 +1,15 @@
+import itertools
+import os
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
 
+from analysis import cache, timing
+from setting import ANALYSIS_MAX_WORKERS, DEFAULT_MAX_WORKERS
+
 
 def _data_set(params: dict) -> dict:
     """
@@ -19,11 +28,16 @@ def _data_set(params: dict) -> dict:
     else:
         hib_end_time = np.datetime64(params["hib_end_time"], "s")
 
-    if pd.isna(params["exclusion_start_time"]) or pd.isna(params["exclusion_end_time"]):
-        exclusion_start_time, exclusion_end_time = None, None
-    else:
-        exclusion_start_time = np.datetime64(params["exclusion_start_time"], "s")
-        exclusion_end_time = np.datetime64(params["exclusion_end_time"], "s")
+    exclusion_start_times = _time_list(params["exclusion_start_time"])
+    exclusion_end_times = _time_list(params["exclusion_end_time"])
+    if len(exclusion_start_times) != len(exclusion_end_times):
+        raise ValueError("The numbers of exclusion start and end times do not match.")
+    # A period missing either time is not excluded
+    exclusion_periods = [
+        (np.datetime64(start, "s"), np.datetime64(end, "s"))
+        for start, end in zip(exclusion_start_times, exclusion_end_times)
+        if not (pd.isna(start) or pd.isna(end))
+    ]
 
     return {
         "id": str(params["ID"]),
@@ -39,14 +53,51 @@ def _data_set(params: dict) -> dict:
         "dead_discrimination": np.int32(params["dead_discrimination"]),
         "refractoryness_discrimination": np.int32(params["refractoryness_discrimination"]),
         "pa_discrimination": np.int32(params["pa_discrimination"]),
-        "exclusion_start_time": exclusion_start_time,
-        "exclusion_end_time": exclusion_end_time,
+        "exclusion_periods": exclusion_periods,
     }
 
 
+def _time_list(value) -> list:
+    """
+    Converts a time parameter which may hold several times into a list.
+
+    Args:
+        value: A time, NaN, or a list of them.
+    Returns:
+        list: The times.
+    """
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return list(value)
+    return [value]
+
+
+# Events stored in the event table, in the order of the result dictionary
+EVENT_NAMES = [
+    "prehib",
+    "PA",
+    "ST",
+    "DT",
+    "Arousal Pending",
+    "Cooling",
+    "Rewarming",
+    "posthib",
+    "low_Tb",
+]
+EVENT_DTYPE = np.dtype(
+    [
+        ("event_code", np.int8),
+        ("event_number", np.int32),
+        ("start_idx", np.int64),
+        ("end_idx", np.int64),
+    ]
+)
+
+
 def _structured() -> dict:
     """
     Initializes a dictionary for storing analysis results in the required format.
+    Each event is stored as the indices of its first and last (exclusive) samples
+    instead of copies of its temperature and time data.
 
     Returns:
         dict: The initialized dictionary.
@@ -54,69 +105,149 @@ def _structured() -> dict:
     return {
         "interval": {},
         "status": "",
-        "tmp": {
-            "prehib": {},
-            "hib_start": None,
-            "hib_end": None,
-            "PA": {},
-            "ST": {},
-            "DT": {},
-            "Arousal Pending": {},
-            "Cooling": {},
-            "Rewarming": {},
-            "posthib": {},
-            "low_Tb": {},
-        },
-        "time": {
-            "prehib": {},
-            "hib_start": None,
-            "hib_end": None,
-            "PA": {},
-            "ST": {},
-            "DT": {},
-            "Arousal Pending": {},
-            "Cooling": {},
-            "Rewarming": {},
-            "posthib": {},
-            "low_Tb": {},
-        },
+        "hib_start_idx": None,
+        "hib_end_idx": None,
+        "events": [],
     }
 
 
-def _get_start_time(time: list, prehib_start_time: np.datetime64) -> np.datetime64:
+def _epoch_seconds(time) -> np.ndarray:
     """
-    Receives time data and parameters, returning the hibernation start time.
+    Converts time data into int64 epoch seconds, on which the categorizer
+    compares and searches times. NaT becomes the minimum int64.
 
     Args:
-        time (list): The time data.
-        params (dict): The parameters.
+        time: The time data or a time.
     Returns:
-        numpy.datetime64: The hibernation start time.
+        numpy.ndarray: The epoch seconds.
     """
-    for i in range(len(time)):
-        if time[i] > prehib_start_time:
-            if i == 0:
-                return time[i]
-            return time[i - 1]
+    return np.asarray(time, dtype="datetime64[s]").astype(np.int64)
+
+
+def _is_sorted(seconds: np.ndarray) -> bool:
+    """
+    Checks whether the epoch seconds can be searched with numpy.searchsorted,
+    i.e. they do not decrease and include no NaT.
+
+    Args:
+        seconds (numpy.ndarray): The epoch seconds.
+    Returns:
+        bool: True if the epoch seconds are sorted, False otherwise.
+    """
+    return not (
+        np.any(np.diff(seconds) < 0) or np.any(seconds == np.iinfo(np.int64).min)
+    )
+
+
+def _get_start_index(
+        seconds: np.ndarray,
+        prehib_start_time: np.datetime64,
+        is_sorted: bool) -> int:
+    """
+    Receives epoch seconds and the pre-hibernation start time, returning the index
+    where the analysis starts: the first sample at the time of the last sample
+    before the first one after the pre-hibernation start time.
+
+    Args:
+        seconds (numpy.ndarray): The epoch seconds.
+        prehib_start_time (numpy.datetime64): The pre-hibernation start time.
+        is_sorted (bool): Whether the epoch seconds are sorted.
+    Returns:
+        int: The index where the analysis starts.
+    """
+    prehib_start_time = _epoch_seconds(prehib_start_time)
+    if is_sorted:
+        after = np.searchsorted(seconds, prehib_start_time, "right")
     else:
+        after = np.argmax(seconds > prehib_start_time)
+        after = after if seconds[after] > prehib_start_time else len(seconds)
+    if after == len(seconds):
         raise ValueError("Not found start time.")
+    start_time = seconds[max(after - 1, 0)]
+    if is_sorted:
+        return np.searchsorted(seconds, start_time, "left")
+    return np.flatnonzero(seconds == start_time)[0]
 
 
-def _get_end_time(time: list, hib_end_time: np.datetime64) -> np.datetime64:
+def _get_end_index(
+        seconds: np.ndarray,
+        hib_end_time: np.datetime64,
+        is_sorted: bool) -> int:
     """
-    Receives time data and parameters, returning the hibernation end time.
+    Receives epoch seconds and the hibernation end time, returning the index of
+    the last sample at or before the hibernation end time (from the third one).
 
     Args:
-        time (list): The time data.
-        params (dict): The parameters.
+        seconds (numpy.ndarray): The epoch seconds.
+        hib_end_time (numpy.datetime64): The hibernation end time.
+        is_sorted (bool): Whether the epoch seconds are sorted.
     Returns:
-        numpy.datetime64: The hibernation end time.
+        int: The index of the hibernation end time.
     """
-    for i in range(len(time) - 1, 1, -1):
-        if time[i] <= hib_end_time:
-            return time[i]
+    hib_end_time = _epoch_seconds(hib_end_time)
+    if is_sorted:
+        end_index = np.searchsorted(seconds, hib_end_time, "right") - 1
     else:
+        before = np.flatnonzero(
+            (seconds <= hib_end_time) & (seconds != np.iinfo(np.int64).min)
+        )
+        end_index = before[-1] if len(before) > 0 else -1
+    if end_index < 2:
         raise ValueError("Not found end time.")
+    return end_index
+
+
+def _hib_end_mask(seconds: np.ndarray, params: dict, is_sorted: bool) -> np.ndarray:
+    """
+    Marks the samples at the hibernation end time.
+
+    Args:
+        seconds (numpy.ndarray): The epoch seconds.
+        params (dict): The parameters.
+        is_sorted (bool): Whether the epoch seconds are sorted.
+    Returns:
+        numpy.ndarray: A boolean mask which is True at the hibernation end time.
+    """
+    if params["hib_end_time"] is None:
+        return np.zeros(len(seconds), dtype=bool)
+    end_index = _get_end_index(seconds, params["hib_end_time"], is_sorted)
+    return seconds == seconds[end_index]
+
+
+def _exclusion_mask(seconds: np.ndarray, params: dict, active: list = None) -> tuple:
+    """
+    Marks the samples skipped for the exclusion periods: for each period,
+    the samples at or after its start time up to its end time, and the first one
+    after its end time. All the periods are compiled into one mask of each kind.
+
+    Args:
+        seconds (numpy.ndarray): The epoch seconds.
+        params (dict): The parameters.
+        active (list): Whether each exclusion period has not ended before the data,
+        for the data received in chunks. If None, every period is active.
+    Returns:
+        tuple: The boolean masks of the excluded samples and of the first samples
+        after the exclusion periods, and whether each exclusion period continues
+        after the data.
+    """
+    periods = params["exclusion_periods"]
+    active = [True] * len(periods) if active is None else active
+    excluded = np.zeros(len(seconds), dtype=bool)
+    ends = np.zeros(len(seconds), dtype=bool)
+    continues = []
+    for (start_time, end_time), is_active in zip(periods, active):
+        if not is_active:
+            continues.append(False)
+            continue
+        period = seconds >= _epoch_seconds(start_time)
+        after = np.flatnonzero(period & (seconds > _epoch_seconds(end_time)))
+        if len(after) > 0:
+            period[after[0]:] = False
+            ends[after[0]] = True
+        continues.append(len(after) == 0)
+        excluded |= period
+    return excluded, ends & ~excluded, continues
+
 
 def _modify_discrimination_to_interval(interval: int, params: dict) -> dict:
     """
@@ -133,128 +264,182 @@ def _modify_discrimination_to_interval(interval: int, params: dict) -> dict:
             params[name] = np.int32(val / interval)
     return params
 
-def _is_hib_start(tmp: list, current_index: int, params: dict) -> bool:
+def _next_index(mask: np.ndarray) -> np.ndarray:
+    """
+    Calculates, for each sample, the index of the first sample at or after it
+    where the mask is True (the length of the mask if there is none).
+
+    Args:
+        mask (numpy.ndarray): The boolean mask.
+    Returns:
+        numpy.ndarray: The suffix array of next True indices.
+    """
+    index = np.where(mask, np.arange(len(mask)), len(mask))
+    return np.minimum.accumulate(index[::-1])[::-1]
+
+
+def _streak_ends(mask: np.ndarray, length: int) -> np.ndarray:
+    """
+    Finds the indices where a streak of consecutive True values in the mask
+    reaches the specified length.
+
+    Args:
+        mask (numpy.ndarray): The boolean mask.
+        length (int): The length of the streak.
+    Returns:
+        numpy.ndarray: A boolean mask which is True where a streak reaches the length.
+    """
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask, [0])).astype(np.int8)))
+    starts, ends = edges[::2], edges[1::2]
+    streak_ends = np.zeros(len(mask), dtype=bool)
+    if length >= 1:
+        streak_ends[starts[ends - starts >= length] + length - 1] = True
+    return streak_ends
+
+
+def _lookup_masks(tmp: np.ndarray, params: dict, streak: int = 0) -> dict:
+    """
+    Computes the masks whose next True indices make up the lookup tables.
+
+    Args:
+        tmp (numpy.ndarray): The temperature data.
+        params (dict): The parameters.
+        streak (int): The length of the in-band streak just before the data,
+        for the data received in chunks.
+    Returns:
+        dict: The masks of the samples out of the band, not below the lower
+        threshold, not below the hibernation start threshold, and where an in-band
+        streak reaches the refractoryness discrimination.
+    """
+    in_band = (params["lower_threshold"] <= tmp) & (tmp < params["upper_threshold"])
+    start_threshold = min(params["upper_threshold"], params["hib_start_tmp"])
+    refractoryness = params["refractoryness_discrimination"]
+    leading = np.ones(min(streak, max(refractoryness, 0)), dtype=bool)
+    return {
+        "next_out_of_band": (
+            (params["lower_threshold"] > tmp) | (tmp >= params["upper_threshold"])
+        ),
+        "next_not_below": params["lower_threshold"] <= tmp,
+        "next_warm": ~(tmp < start_threshold),
+        "next_streak_end": _streak_ends(
+            np.concatenate((leading, in_band)), refractoryness
+        )[len(leading):],
+    }
+
+
+def _lookup_tables(tmp: np.ndarray, params: dict) -> dict:
+    """
+    Precomputes the suffix arrays used by the hibernation start, hibernation end,
+    death and datalogger removal conditions. They are computed once per recording
+    so that each condition is checked in constant time regardless of the length
+    of its discrimination window.
+
+    Args:
+        tmp (numpy.ndarray): The temperature data.
+        params (dict): The parameters.
+    Returns:
+        dict: The next index of a sample out of the band, not below the lower
+        threshold, not below the hibernation start threshold, and the next index
+        where an in-band streak reaches the refractoryness discrimination.
     """
-    Receives temperature data, the current index, time interval, and parameters, 
+    return {
+        name: _next_index(mask) for name, mask in _lookup_masks(tmp, params).items()
+    }
+
+
+def _is_hib_start(lookup: dict, current_index: int, params: dict) -> bool:
+    """
+    Receives the lookup tables, the current index, and parameters,
     returning a boolean value indicating whether the hibernation start condition
     is met.
 
     Args:
-        tmp (list): The temperature data.
+        lookup (dict): The lookup tables of the recording.
         current_index (int): The current index.
         params (dict): The parameters.
     Returns:
         bool: True if the hibernation start condition is met, False otherwise.
     """
-    for i in range(1, params["hib_start_discrimination"] + 1):
-        if len(tmp) <= current_index + i:
-            return False
-
-        if tmp[current_index + i] < params["upper_threshold"] <= params[
-            "hib_start_tmp"
-        ] or (
-            params["upper_threshold"] > params["hib_start_tmp"]
-            and tmp[current_index + i] < params["hib_start_tmp"]
-        ):
-            continue
-        else:
-            return False
-    return True
+    start_point_index = current_index + params["hib_start_discrimination"]
+    if params["hib_start_discrimination"] <= 0:
+        return True
+    elif len(lookup["next_warm"]) <= start_point_index:
+        return False
+    return lookup["next_warm"][current_index + 1] > start_point_index
 
 
-def _is_hib_end(
-        tmp: list, 
-        current_index: int,
-        interval: int, 
-        params: dict) -> bool:
+def _is_hib_end(lookup: dict, current_index: int, params: dict) -> bool:
     """
-    Receives temperature data, the current index, time interval, and parameters, 
+    Receives the lookup tables, the current index, and parameters,
     returning a boolean value indicating whether the hibernation end condition is met.
-    
+    The current index must be at or above the upper threshold.
+
     Args:
-        tmp (list): The temperature data.
+        lookup (dict): The lookup tables of the recording.
         current_index (int): The current index.
-        interval (int): The time interval.
         params (dict): The parameters.
     Returns:
         bool: True if the hibernation end condition is met, False otherwise.
     """
+    length = len(lookup["next_streak_end"])
     end_point_index = params["hib_end_discrimination"]
     index = (
         end_point_index
-        if len(tmp) > current_index + end_point_index
-        else len(tmp) - current_index
+        if length > current_index + end_point_index
+        else length - current_index
     )
-    count = 0
-    for i in range(index):
-        if count != params["refractoryness_discrimination"]:
-            if (
-                params["lower_threshold"]
-                <= tmp[current_index + i]
-                < params["upper_threshold"]
-            ):
-                count += 1
-            else:
-                count = 0
-        else:
-            return False
-    return True
+    if params["refractoryness_discrimination"] < 0:
+        return True
+    elif params["refractoryness_discrimination"] == 0:
+        return index <= 0
+    # no in-band streak reaches the refractoryness before the window ends
+    return lookup["next_streak_end"][current_index] > current_index + index - 2
 
 
-def _is_dead(tmp: list, current_index: int, params: dict) -> bool:
+def _is_dead(lookup: dict, current_index: int, params: dict) -> bool:
     """
-    Receives temperature data, the current index, time interval, and parameters,
-    returning a boolean value indicating whether the death condition is met. 
-    
+    Receives the lookup tables, the current index, and parameters,
+    returning a boolean value indicating whether the death condition is met.
+
     Args:
-        tmp (list): The temperature data.
+        lookup (dict): The lookup tables of the recording.
         current_index (int): The current index.
         params (dict): The parameters.
     Returns:
         bool: True if the death condition is met, False otherwise.
     """
-    # dead_point_index = interval * 24 * params["dead_discrimination"]
+    length = len(lookup["next_not_below"])
     dead_point_index = params["dead_discrimination"]
     index = (
         dead_point_index
-        if len(tmp) > current_index + dead_point_index
-        else len(tmp) - current_index
+        if length > current_index + dead_point_index
+        else length - current_index
     )
-    for i in range(index):
-        if params["lower_threshold"] <= tmp[current_index + i]:
-            return False
-    return True
+    return lookup["next_not_below"][current_index] >= current_index + index
 
 
-def _is_hib_stop(
-        tmp: list, 
-        current_index: int,
-        params: dict) -> bool:
+def _is_hib_stop(lookup: dict, current_index: int) -> bool:
     """
-    Receives temperature data, the current index, and parameters,
+    Receives the lookup tables and the current index,
     returning a boolean value indicating whether the datalogger removal condition
     is met.
 
     Args:
-        tmp (list): The temperature data.
+        lookup (dict): The lookup tables of the recording.
         current_index (int): The current index.
-        params (dict): The parameters.
     Returns:
         bool: True if the datalogger removal condition is met, False otherwise.
     """
-    for i in range(1, len(tmp) - current_index):
-        if (
-            params["lower_threshold"] > tmp[current_index + i]
-            or tmp[current_index + i] >= params["upper_threshold"]
-        ):
-            return False
-    return True
+    length = len(lookup["next_out_of_band"])
+    next_index = current_index + 1
+    return next_index >= length or lookup["next_out_of_band"][next_index] == length
 
 
 def _get_interval(time: list) -> dict:
     """
-    Calculates the time interval between data points (e.g., the time difference 
-    between the first and second data points).
+    Calculates the time interval between data points as the most frequent
+    difference between consecutive time points, so that gaps, duplicates and
+    out-of-order points do not change it.
 
     Args:
         time (list): The time data.
@@ -262,10 +447,117 @@ def _get_interval(time: list) -> dict:
         dict:  dictionary containing the time interval in various formats (seconds, 
         minutes, and a string representation).
     """
-    interval = str(time[1] - time[0])
-    seconds = int(interval.replace(" seconds", ""))
+    seconds = check_time(time)["interval"]
     minutes = int(seconds / 60)
-    return {"seconds": seconds, "minutes": minutes, "with_seconds": interval}
+    return {
+        "seconds": seconds,
+        "minutes": minutes,
+        "with_seconds": f"{seconds} seconds",
+    }
+
+
+def check_time(time: list) -> dict:
+    """
+    Inspects the sampling of the time data: the interval, the gaps, and the
+    duplicate and out-of-order time points.
+
+    Args:
+        time (list): The time data.
+    Returns:
+        dict: The interval in seconds ("interval"), the indices after which
+        a gap starts ("gaps") with the number of missing points ("missing"),
+        and the indices of the duplicate ("duplicates") and out-of-order
+        ("out_of_order") time points.
+    """
+    diff = np.diff(_epoch_seconds(time))
+    intervals, counts = np.unique(diff[diff > 0], return_counts=True)
+    if len(intervals) == 0:
+        raise ValueError("Not found interval.")
+    interval = int(intervals[np.argmax(counts)])
+    gaps = np.flatnonzero(diff > interval)
+    return {
+        "interval": interval,
+        "gaps": gaps,
+        "missing": int(np.sum(diff[gaps] // interval - 1)),
+        "duplicates": np.flatnonzero(diff == 0) + 1,
+        "out_of_order": np.flatnonzero(diff < 0) + 1,
+    }
+
+
+def resample(
+        data: pd.DataFrame,
+        interval: int = None,
+        max_gap: int = None) -> pd.DataFrame:
+    """
+    Resamples the data to a regular time grid starting at its first time point.
+    The data is sorted by time, the duplicate time points are dropped, and
+    the temperature on the grid is linearly interpolated.
+
+    Args:
+        data (pandas.DataFrame): The input data containing temperature
+        and time information.
+        interval (int): The interval of the grid in seconds.
+        If None, the interval of the data is used.
+        max_gap (int): The longest gap in seconds which is interpolated.
+        The grid points in longer gaps are NaN. If None, every gap is interpolated.
+    Returns:
+        pandas.DataFrame: The resampled data.
+    """
+    seconds = _epoch_seconds(data["Date/Time"].values)
+    order = np.argsort(seconds, kind="stable")
+    seconds, first = np.unique(seconds[order], return_index=True)
+    tmp = data["Value"].values[order][first].astype(np.float64)
+    interval = interval or check_time(data["Date/Time"].values)["interval"]
+
+    grid = np.arange(seconds[0], seconds[-1] + 1, interval)
+    values = np.interp(grid, seconds, tmp)
+    if max_gap is not None:
+        previous = np.searchsorted(seconds, grid, "right") - 1
+        following = np.minimum(previous + 1, len(seconds) - 1)
+        in_gap = (seconds[following] - seconds[previous] > max_gap) & (
+            grid != seconds[previous]
+        )
+        values[in_gap] = np.nan
+    return pd.DataFrame(
+        {"Date/Time": grid.astype("datetime64[s]"), "Value": values}
+    )
+
+
+def check_sampling(
+        data: dict,
+        resampling: bool = False,
+        max_gap: int = None) -> tuple:
+    """
+    Reports the gaps, duplicate and out-of-order time points of each file,
+    and resamples the data to a regular time grid if specified.
+
+    Args:
+        data (dict): The input data (pandas.DataFrame) of each file.
+        resampling (bool): Whether to resample the data.
+        max_gap (int): The longest gap in seconds which is interpolated
+        by the resampling.
+    Returns:
+        tuple: The data of each file and the sampling report of each file.
+    """
+    data, reports = dict(data), {}
+    for file, df in data.items():
+        try:
+            reports[file] = check_time(df["Date/Time"].values)
+        except ValueError as e:
+            print(f"Sampling check error in {file}: {str(e)}")
+            continue
+        report = reports[file]
+        if len(report["gaps"]) > 0:
+            print(
+                f"Warning: {len(report['gaps'])} gaps ({report['missing']} missing "
+                f"points) in {file}"
+            )
+        for name in ["duplicates", "out_of_order"]:
+            if len(report[name]) > 0:
+                print(f"Warning: {len(report[name])} {name} time points in {file}")
+        if resampling:
+            data[file] = resample(df, report["interval"], max_gap)
+    return data, reports
 
 
 def _get_dead_index(tmp: list, current_index: int, dead_descrimination: int) -> int:
@@ -298,325 +590,2046 @@ def _get_dead_index(tmp: list, current_index: int, dead_descrimination: int) ->
     return dead_idx
 
 
-def _append_proc(
-        event_name: str,
-        results: dict,
-        process_tmp: list,
-        process_time: list) -> None:
+def _prepare(tmp: list, time: list, params: dict) -> dict:
+    """
+    Performs the preprocessing which does not depend on the thresholds and
+    the discriminations: the conversion to arrays and epoch seconds, the time
+    interval and the index of the pre-hibernation start time.
+
+    Args:
+        tmp (list): The temperature data.
+        time (list): The time data.
+        params (dict): The parameters.
+    Returns:
+        dict: The preprocessed data. "start_index" is None if the pre-hibernation
+        start time is not found.
+    """
+    tmp = np.asarray(tmp, dtype=np.float64)
+    time = np.asarray(time)
+    seconds = _epoch_seconds(time)
+    prepared = {
+        "tmp": tmp,
+        "time": time,
+        "seconds": seconds,
+        "sorted": _is_sorted(seconds),
+        "interval": _get_interval(time),
+        "start_index": None,
+    }
+    try:
+        prepared["start_index"] = _get_start_index(
+            seconds, params["prehib_start_time"], prepared["sorted"]
+        )
+    except ValueError:
+        pass
+    return prepared
+
+
+def _trim(prepared: dict, params: dict) -> tuple:
+    """
+    Trims the preprocessed data to start at the pre-hibernation start time.
+
+    Args:
+        prepared (dict): The preprocessed data.
+        params (dict): The parameters.
+    Returns:
+        tuple: The trimmed temperature data, time data and epoch seconds.
+    """
+    if prepared["start_index"] is None:
+        raise ValueError("Not found start time.")
+    start_index = prepared["start_index"]
+    params["prehib_start_time"] = prepared["time"][start_index]
+    return (
+        prepared["tmp"][start_index:],
+        prepared["time"][start_index:],
+        prepared["seconds"][start_index:],
+    )
+
+
+def _append_event(event_name: str, results: dict, start: int, end: int) -> None:
     """
-    Appends processed temperature and time data to the results dictionary
-    under the specified event name.
+    Appends an event to the results dictionary as the indices of its first
+    and last (exclusive) samples.
 
     Args:
         event_name (str): The name of the event (e.g., 'PA', 'ST', 'DT').
         results (dict): The dictionary storing the analysis results.
-        process_tmp (list): The list of processed temperature data.
-        process_time (list): The list of processed time data.
+        start (int): The index of the first sample of the event.
+        end (int): The index after the last sample of the event.
     """
-    if None in process_tmp or None in process_time:
-        return None
-    elif len(process_tmp) == 0 or len(process_time) == 0:
+    if end <= start:
         return None
-    elif 1 in results["tmp"][event_name]:
-        event_num = next(iter(reversed(results["tmp"][event_name].keys()))) + 1
-    else:
-        event_num = 1
+    results["events"].append((EVENT_NAMES.index(event_name), start, end))
 
-    results["tmp"][event_name][event_num] = process_tmp
-    results["time"][event_name][event_num] = process_time
 
+def _event_table(events: list) -> np.ndarray:
+    """
+    Converts the appended events into the event table, numbering the events
+    of each name in the order they were appended.
 
-def _peak_counts(tmp: list, time: list, params: dict) -> dict:
+    Args:
+        events (list): The list of (event_code, start_idx, end_idx).
+    Returns:
+        numpy.ndarray: The event table of EVENT_DTYPE.
     """
-    Detects changes in hibernation status and analyzes the duration of each status.
+    table = np.zeros(len(events), dtype=EVENT_DTYPE)
+    if len(events) == 0:
+        return table
+    codes, starts, ends = np.array(events, dtype=np.int64).T
+    table["event_code"] = codes
+    table["start_idx"] = starts
+    table["end_idx"] = ends
+    for code in np.unique(codes):
+        is_event = codes == code
+        table["event_number"][is_event] = np.arange(1, is_event.sum() + 1)
+    return table
+
+
+def _finalize(
+        results: dict,
+        tmp: np.ndarray,
+        time: np.ndarray,
+        excluded: list = None,
+        dropped: list = None) -> dict:
+    """
+    Stores the analyzed temperature and time data with the indices of the excluded
+    and dropped samples, and converts the appended events into the event table.
 
     Args:
-        tmp (list): The temperature data.
-        time (list): The time data.
-        params (dict): The parameters.
+        results (dict): The dictionary storing the analysis results.
+        tmp (numpy.ndarray): The temperature data.
+        time (numpy.ndarray): The time data.
+        excluded (list): The indices of the excluded samples.
+        dropped (list): The indices of the samples left out of every event:
+        the first sample after each exclusion period and the sample where
+        the end of the hibernation is detected.
     Returns:
         dict: The dictionary storing the analysis results.
     """
-    results = _structured()
-    interval = _get_interval(time)
-    params = _modify_discrimination_to_interval(interval["minutes"], params)
-    results |= {
-        "interval": interval,
-        "ID": params["id"],
-        "group": params["group"],
+    results["data"] = {
+        "tmp": tmp,
+        "time": time,
+        "excluded": np.array(excluded or [], dtype=np.int64),
+        "dropped": np.array(dropped or [], dtype=np.int64),
     }
-    
-    tmp = np.array(tmp, dtype=np.float64)
+    results["data"]["skipped"] = _missing_samples(results)
+    results["events"] = _trim_events(
+        _event_table(results["events"]),
+        results["data"]["skipped"],
+        results["data"]["dropped"],
+    )
+    return results
 
-    # For Non-Hibernation 
-    valid_tmp = tmp[~np.isnan(tmp)]
-    if len(valid_tmp) > 0 and np.all(valid_tmp > params["hib_start_tmp"]):
-        _append_proc("prehib", results, tmp.tolist(), time)
-        results["status"] = "Unhibernation"
-        return results
 
-    params["prehib_start_time"] = _get_start_time(time, params["prehib_start_time"])
-    for i in range(len(time)):
-        if time[i] == params["prehib_start_time"]:
-            tmp = tmp[i:]
-            time = time[i:]
-            break
-    exclusion_flag = None not in [
-        params["exclusion_start_time"],
-        params["exclusion_end_time"],
-    ]
-    if params["hib_end_time"] is not None:
-        params["hib_end_time"] = _get_end_time(time, params["hib_end_time"])
+def _missing_samples(results: dict, start: int = 0, end: int = None) -> np.ndarray:
+    """
+    Finds the samples without temperature (NaN) which the analysis loop skips
+    up to the end of the hibernation. Only the pre-hibernation and the samples
+    after the death keep them. The excluded samples are kept as NaN in every
+    event, and the dropped samples are left out of every event.
 
-    previous_tmp, process_tmp, process_time = None, [], []
-    for i in range(len(tmp)):
-        if exclusion_flag and params["exclusion_start_time"] <= time[i]:
-            if time[i] <= params["exclusion_end_time"]:
-                process_tmp.append(np.nan)
-                process_time.append(np.nan)
-                continue
-            else:
-                exclusion_flag = False
-                pass
-        elif i == 0:
-            process_tmp.append(tmp[i])
-            process_time.append(time[i])
-            continue
-        elif params["hib_end_time"] == time[i]:
-            results["tmp"]["hib_end"] = tmp[i]
-            results["time"]["hib_end"] = time[i]
-            break
-        # For Post-Hibernation
-        elif results["time"]["hib_end"] is not None and results["time"]["hib_end"] != time[-1]:
-            range_index = (
-                interval["minutes"] * 24 * 7
-                if interval["minutes"] * 24 * 7 <= len(time)
-                else len(time) - 1
-            )
-            for posthib_i in range(range_index - i):
-                process_tmp.append(tmp[i + posthib_i])
-                process_time.append(time[i + posthib_i])
-                _append_proc("posthib", results, process_tmp, process_time)
-            break
-        # For Pre-Hibernation
-        elif results["time"]["hib_start"] is None:
-            process_tmp.append(tmp[i])
-            process_time.append(time[i])
-
-            # Check whether the hibernation beginning is accurate
-            if _is_hib_start(tmp, i, params):
-                results["tmp"]["hib_start"] = tmp[i + 1]
-                results["time"]["hib_start"] = time[i + 1]
-                if params["hib_start_tmp"] < params["upper_threshold"]:
-                    for re_i in range(i, 1, -1):
-                        if tmp[re_i] > params["upper_threshold"]:
-                            previous_tmp = tmp[re_i]
-                            break
-                else:
-                    previous_tmp = tmp[i]
-                _append_proc("prehib", results, process_tmp, process_time)
-                process_tmp, process_time = [], []
-            else:
-                if len(tmp) <= i + params["hib_start_discrimination"]:
-                    _append_proc("prehib", results, tmp.tolist(), time)
-                    results["status"] = "Unhibernation"
-                    break
-        elif (
-            results["time"]["hib_start"] is not None
-            and params["lower_threshold"] <= tmp[i] < params["upper_threshold"]
-        ):
-            if results["time"]["hib_end"] is None and (
-                params["lower_threshold"] > tmp[i - 1]
-                or params["upper_threshold"] <= tmp[i - 1]
-            ):
-                # Check whether the data logger has been taken out
-                if _is_hib_stop(tmp, i, params):
-                    results["tmp"]["hib_end"] = tmp[i - 1]
-                    results["time"]["hib_end"] = time[i - 1]
-                    results["status"] = "Termination"
-                    break
-            process_tmp.append(tmp[i])
-            process_time.append(time[i])
-        elif tmp[i] < params["lower_threshold"]:
-            # Check whether dead
-            if results["time"]["hib_end"] is None and _is_dead(tmp, i, params):
-                dead_idx = _get_dead_index(tmp, i, params["dead_discrimination"])
-
-                results["tmp"]["hib_end"] = tmp[i - 1]
-                results["time"]["hib_end"] = time[i - 1]
-
-                process_tmp += list(tmp[i : i + dead_idx])
-                process_time += list(time[i : i + dead_idx])
-                _append_proc("DT", results, process_tmp, process_time)
-                process_tmp, process_time = [], []
-                results["status"] = "Dead"
-                break
-            # For Cooling
-            elif previous_tmp is not None and previous_tmp >= params["upper_threshold"]:
-                _append_proc("Cooling", results, process_tmp, process_time)
-                process_tmp, process_time = [], []
-                previous_tmp = tmp[i - 1]
-            # For Arousal Pending
-            elif previous_tmp is not None and previous_tmp < params["lower_threshold"]:
-                _append_proc("Arousal Pending", results, process_tmp, process_time)
-                process_tmp, process_time = [], []
-                previous_tmp = tmp[i - 1]
-
-            process_tmp.append(tmp[i])
-            process_time.append(time[i])
-            # For Deep torpor
-            if i + 1 < len(tmp) and tmp[i + 1] >= params["lower_threshold"]:
-                _append_proc("DT", results, process_tmp, process_time)
-                process_tmp, process_time = [], []
-                previous_tmp = tmp[i]
-        elif results["time"]["hib_start"] is not None and tmp[i] >= params["upper_threshold"]:
-            # For Shallow Torpor
-            if previous_tmp is not None and previous_tmp >= params["upper_threshold"]:
-                _append_proc("ST", results, process_tmp, process_time)
-                process_tmp, process_time = [], []
-                previous_tmp = tmp[i - 1]
-            # For Rewarming
-            elif previous_tmp is not None and previous_tmp < params["lower_threshold"]:
-                _append_proc("Rewarming", results, process_tmp, process_time)
-                process_tmp, process_time = [], []
-                previous_tmp = tmp[i - 1]
-            # Check wether the hibernation is over
-            if results["time"]["hib_end"] is None and _is_hib_end(
-                tmp, i, interval["minutes"], params
-            ):
-                results["tmp"]["hib_end"] = tmp[i - 1]
-                results["time"]["hib_end"] = time[i - 1]
-                results["status"] = "Refractoriness"
-                continue
-
-            process_tmp.append(tmp[i])
-            process_time.append(time[i])
-
-            # For Periodic Arousal
-            if i + 1 < len(tmp) and tmp[i + 1] < params["upper_threshold"]:
-                _append_proc("PA", results, process_tmp, process_time)
-                process_tmp, process_time = [], []
-                previous_tmp = tmp[i]
-    return results
+    Args:
+        results (dict): The dictionary storing the analysis results.
+        start (int): The first index of the searched range.
+        end (int): The index next to the last of the searched range.
+    Returns:
+        numpy.ndarray: The sorted indices of the samples.
+    """
+    missing = np.setdiff1d(
+        np.flatnonzero(np.isnan(results["data"]["tmp"][start:end])) + start,
+        np.concatenate((results["data"]["excluded"], results["data"]["dropped"])),
+        assume_unique=True,
+    )
+    if results["hib_end_idx"] is not None:
+        missing = missing[missing <= results["hib_end_idx"]]
+    return missing
 
 
-def modify_pa(results: dict, pa_discrimination: int) -> dict:
+def _skips(code: int) -> bool:
     """
-    Modifies the PA (Periodic Arousal) events to ensure accurate classification.
-    It addresses the issue where temporary ST (Shallow Torpor) events are incorrectly
-    mixed with PA events occurring during the normal temperature state.
+    Checks whether the events of a code leave out the skipped samples.
+
+    Args:
+        code (int): The event code.
+    Returns:
+        bool: False for the pre-hibernation, True otherwise.
+    """
+    return EVENT_NAMES[code] != "prehib"
+
+
+def _left_out(results: dict, code: int) -> np.ndarray:
+    """
+    Picks up the samples left out of the events of a code: the dropped samples,
+    and the skipped samples if the events skip them.
 
     Args:
         results (dict): The dictionary storing the analysis results.
-        pa_discrimination (int): 
+        code (int): The event code.
     Returns:
-        dict: The dictionary storing the analysis results.
+        numpy.ndarray: The sorted indices of the samples.
     """
-    interval = results["interval"]["minutes"]
+    if _skips(code):
+        return np.union1d(results["data"]["skipped"], results["data"]["dropped"])
+    return results["data"]["dropped"]
 
-    st_keys_set = set()
-    temp_pa_time, temp_pa_tmp = [], []
-    for pa_time, pa_tmp in zip(
-        results["time"]["PA"].values(), results["tmp"]["PA"].values()
-    ):
-        adjust_st_flag = False
-        for st_num, st_time in results["time"]["ST"].items():
-            if st_num in st_keys_set:
-                continue
-
-            if len(st_time) < pa_discrimination and \
-                pa_time[-1] + np.timedelta64(interval, "m") == st_time[0]:
-                    temp_pa_tmp.append(pa_tmp + results["tmp"]["ST"][st_num])
-                    temp_pa_time.append(pa_time + st_time)
-                    st_keys_set.add(st_num)
-                    adjust_st_flag = True
-                    break
-        
-        if not adjust_st_flag:
-            temp_pa_tmp.append(pa_tmp)
-            temp_pa_time.append(pa_time)
-    
-    remaining_st_tmp, remaining_st_time = {}, {}
-    st_counter = 0
-    for st_num, st_time in results["time"]["ST"].items():
-        if st_num not in st_keys_set:
-            st_counter += 1
-            remaining_st_tmp[st_counter] = results["tmp"]["ST"][st_num]
-            remaining_st_time[st_counter] = st_time
-    
-    merge_pa_time, merge_pa_tmp = [], []
-    for new_pa_time, new_pa_tmp in zip(temp_pa_time, temp_pa_tmp):
-        if len(merge_pa_time) == 0:
-            merge_pa_tmp.append(new_pa_tmp)
-            merge_pa_time.append(new_pa_time)
-        elif merge_pa_time[-1][-1] + np.timedelta64(interval, "m") == new_pa_time[0]:
-            merge_pa_tmp[-1].extend(new_pa_tmp)
-            merge_pa_time[-1].extend(new_pa_time)
-        else:
-            merge_pa_tmp.append(new_pa_tmp)
-            merge_pa_time.append(new_pa_time)
 
-    results["tmp"]["PA"] = {i + 1: pa for i, pa in enumerate(merge_pa_tmp)}
-    results["time"]["PA"] = {i + 1: pa for i, pa in enumerate(merge_pa_time)}
-    results["tmp"]["ST"] = remaining_st_tmp
-    results["time"]["ST"] = remaining_st_time
-    return results
+def _trim_events(
+        events: np.ndarray,
+        skipped: np.ndarray,
+        dropped: np.ndarray) -> np.ndarray:
+    """
+    Moves the first and last samples of the events to the samples they keep,
+    leaving out the dropped samples and the skipped samples if the events
+    skip them, and removes the events keeping no samples, so that the events
+    start and end where their data does.
 
+    Args:
+        events (numpy.ndarray): The event table.
+        skipped (numpy.ndarray): The sorted indices of the skipped samples.
+        dropped (numpy.ndarray): The sorted indices of the dropped samples.
+    Returns:
+        numpy.ndarray: The event table.
+    """
+    if len(skipped) + len(dropped) == 0 or len(events) == 0:
+        return events
+    size = int(events["end_idx"].max())
+    for indices in [skipped, dropped]:
+        size = max(size, int(indices[-1]) + 1 if len(indices) else 0)
+    trimmed = events.copy()
+    skips = np.array([_skips(code) for code in events["event_code"]], dtype=bool)
+    for selected, left_out in [
+        (skips, np.union1d(skipped, dropped)),
+        (~skips, dropped),
+    ]:
+        kept = np.ones(size, dtype=bool)
+        kept[left_out] = False
+        first = _next_index(kept)
+        last = np.maximum.accumulate(np.where(kept, np.arange(size), -1))
+        trimmed["start_idx"][selected] = first[events["start_idx"][selected]]
+        trimmed["end_idx"][selected] = last[events["end_idx"][selected] - 1] + 1
+    trimmed = trimmed[trimmed["end_idx"] > trimmed["start_idx"]]
+    # renumbered as the analysis loop never appends an empty event
+    return _event_table(trimmed[["event_code", "start_idx", "end_idx"]].tolist())
 
-def get_low_tb_events(results: dict, prehib_low_Tb_threshold: int) -> dict:
+
+def _masked_data(results: dict, key: str, start: int = 0, end: int = None):
     """
-    Extracts events where the body temperature falls below a predefined threshold
-    during the pre-hibernation period.
+    Picks up the analyzed data in the specified range with NaN (NaT) in place of
+    the excluded samples. The data is copied only if the range overlaps
+    the excluded samples.
 
     Args:
         results (dict): The dictionary storing the analysis results.
-        prehib_low_Tb_threshold (int): The parameters.
+        key (str): The kind of the data ("tmp" or "time").
+        start (int): The first index of the range.
+        end (int): The index next to the last of the range.
     Returns:
-        dict: The dictionary storing the analysis results.
+        numpy.ndarray: The data in the range.
     """
-    process_tmp, process_time = [], []
-    if 1 not in results["tmp"]["prehib"] or 1 not in results["time"]["prehib"]:
-        return results
-
-    tmp = results["tmp"]["prehib"][1]
-    time = results["time"]["prehib"][1]
-    for i in range(len(tmp) - 1):
-        if tmp[i] < prehib_low_Tb_threshold:
-            process_tmp.append(tmp[i])
-            process_time.append(time[i])
-            # For a single data
-            if (
-                tmp[i - 1] >= prehib_low_Tb_threshold
-                and tmp[i + 1] >= prehib_low_Tb_threshold
-            ):
-                _append_proc("low_Tb", results, process_tmp, process_time)
-                process_tmp, process_time = [], []
-            # For muptiple data
-            elif tmp[i + 1] >= prehib_low_Tb_threshold:
-                _append_proc("low_Tb", results, process_tmp, process_time)
-                process_tmp, process_time = [], []
-    return results
+    data = results["data"][key]
+    excluded = results["data"]["excluded"]
+    end = len(data) if end is None else end
+    lower, upper = np.searchsorted(excluded, [start, end])
+    if lower == upper:
+        return data[start:end]
+    masked = data[start:end].copy()
+    masked[excluded[lower:upper] - start] = (
+        np.datetime64("NaT") if key == "time" else np.nan
+    )
+    return masked
 
 
-def analyze(param_list: list, data: pd.DataFrame) -> dict:
+def event_dict(results: dict) -> dict:
     """
-    The main function that performs the analysis.
-    It preprocesses the data, analyzes the hibernation status,
-    and modifies the results.
+    Expands the event table into the dictionary of temperature and time data
+    of each event. The data of each event is a view of the analyzed data, except
+    for the events overlapping the excluded samples or leaving out
+    the skipped and dropped samples (see _missing_samples, _finalize and
+    get_low_tb_events).
 
     Args:
-        param_list (list): The list containing the model's parameter set.
-        data (pandas.DataFrame): The input data containing temperature
-        and time information.
+        results (dict): The dictionary storing the analysis results.
     Returns:
-        dict: The dictionary storing the analysis results.
+        dict: The dictionary of the temperature ("tmp") and time ("time") data
+        keyed by event name and event number.
     """
-    tmp = data["Value"].values
-    time = data["Date/Time"].values
+    events = {"tmp": {}, "time": {}}
+    left_out = [_left_out(results, code) for code in range(len(EVENT_NAMES))]
+    for key in ["tmp", "time"]:
+        events[key] = {name: {} for name in EVENT_NAMES}
+        for point in ["hib_start", "hib_end"]:
+            index = results[f"{point}_idx"]
+            events[key][point] = (
+                None if index is None else results["data"][key][index]
+            )
+        for code, num, start, end in results["events"]:
+            data = _masked_data(results, key, start, end)
+            lower, upper = np.searchsorted(left_out[code], [start, end])
+            if lower < upper:
+                data = np.delete(data, left_out[code][lower:upper] - start)
+            events[key][EVENT_NAMES[code]][int(num)] = data
+        # keep the order of the events of the result dictionary
+        events[key] = {
+            name: events[key][name]
+            for name in ["prehib", "hib_start", "hib_end"] + EVENT_NAMES[1:]
+        }
+    return events
+
+
+def _reduce_ranges(ufunc: np.ufunc, values: np.ndarray, starts, ends) -> np.ndarray:
+    """
+    Reduces the values in each [start, end) range with a ufunc in one pass.
+    The ranges must not be empty but may overlap.
+
+    Args:
+        ufunc (numpy.ufunc): The binary ufunc (e.g., numpy.add).
+        values (numpy.ndarray): The values.
+        starts (numpy.ndarray): The first index of each range.
+        ends (numpy.ndarray): The index next to the last of each range.
+    Returns:
+        numpy.ndarray: The reduced value of each range.
+    """
+    # the odd slices between the ranges are dropped, and the padding makes
+    # the index at the end of the values valid
+    padded = np.append(values, values[:1])
+    return ufunc.reduceat(padded, np.column_stack((starts, ends)).ravel())[::2]
+
+
+def event_statistics(results: dict) -> pd.DataFrame:
+    """
+    Computes the statistics of each event from the event table in one vectorized
+    pass: the duration, the minimum, maximum and mean body temperature,
+    the area under the temperature curve and the rate of temperature change
+    between the first and last points (negative for cooling).
+    The excluded samples and the samples left out of the events (see event_dict)
+    are left out. The post-hibernation events are not included as in
+    the analysis summary.
+
+    Args:
+        results (dict): The dictionary storing the analysis results.
+    Returns:
+        pandas.DataFrame: The statistics of each event in the order of
+        the analysis summary.
+    """
+    events = results["events"]
+    events = events[
+        (events["event_code"] != EVENT_NAMES.index("posthib"))
+        & (events["end_idx"] > events["start_idx"])
+    ]
+    events = events[np.lexsort((events["event_number"], events["event_code"]))]
+    first, last = events["start_idx"], events["end_idx"] - 1
+
+    tmp = np.array(results["data"]["tmp"], dtype=np.float64)
+    tmp[results["data"]["excluded"]] = np.nan
+    tmp[results["data"]["dropped"]] = np.nan
+    seconds = _epoch_seconds(results["data"]["time"])
+    # the events skipping samples are reduced on a second copy of the data
+    # without them
+    skipped = tmp.copy()
+    skipped[results["data"]["skipped"]] = np.nan
+    skips = np.array([_skips(code) for code in events["event_code"]], dtype=bool)
+    shift = np.where(skips, len(tmp), 0)
+    starts, ends = first + shift, last + 1 + shift
+    tmp = np.concatenate((tmp, skipped))
+    seconds = np.tile(seconds, 2)
+    valid = ~np.isnan(tmp)
+    points = _reduce_ranges(np.add, valid.astype(np.int64), starts, ends)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = _reduce_ranges(np.add, np.where(valid, tmp, 0), starts, ends) / points
+
+    # the single point events last the interval as in the analysis summary
+    duration = np.where(
+        ends - starts > 1,
+        seconds[ends - 1] - seconds[starts],
+        results["interval"]["seconds"],
+    ) / 3600
+    # trapezoids between consecutive points, leaving out the excluded samples
+    trapezoids = (tmp[1:] + tmp[:-1]) / 2 * np.diff(seconds) / 3600
+    trapezoids = np.where(np.isnan(trapezoids), 0, trapezoids)
+    multiple = ends - starts > 1
+    auc = np.zeros(len(events))
+    if multiple.any():
+        auc[multiple] = _reduce_ranges(
+            np.add, trapezoids, starts[multiple], ends[multiple] - 1
+        )
+
+    return pd.DataFrame(
+        {
+            "ID": results["ID"],
+            "Event Name": [
+                (
+                    "pre_hibernation"
+                    if EVENT_NAMES[code] == "prehib"
+                    else EVENT_NAMES[code]
+                )
+                for code in events["event_code"]
+            ],
+            "Event Number": events["event_number"],
+            "First Point of Event": results["data"]["time"][first],
+            "Last Point of Event": results["data"]["time"][last],
+            "Duration (h)": duration,
+            "Points": points,
+            "Min Tb": _reduce_ranges(np.fmin, tmp, starts, ends),
+            "Max Tb": _reduce_ranges(np.fmax, tmp, starts, ends),
+            "Mean Tb": mean,
+            "AUC (°C·h)": auc,
+            "Rate (°C/h)": (tmp[ends - 1] - tmp[starts]) / duration,
+            "Group": results["group"],
+        }
+    )
+
+
+def _peak_counts(
+        tmp: list,
+        time: list,
+        params: dict,
+        prepared: dict = None) -> dict:
+    """
+    Detects changes in hibernation status and analyzes the duration of each status.
+
+    Args:
+        tmp (list): The temperature data.
+        time (list): The time data.
+        params (dict): The parameters.
+        prepared (dict): The data preprocessed by _prepare.
+        If None, it is computed from the data.
+    Returns:
+        dict: The dictionary storing the analysis results.
+    """
+    prepared = prepared or _prepare(tmp, time, params)
+    tmp, time = prepared["tmp"], prepared["time"]
+    results = _structured()
+    interval = prepared["interval"]
+    params = _modify_discrimination_to_interval(interval["minutes"], params)
+    results |= {
+        "interval": interval,
+        "ID": params["id"],
+        "group": params["group"],
+    }
+
+    # For Non-Hibernation
+    valid_tmp = tmp[~np.isnan(tmp)]
+    if len(valid_tmp) > 0 and np.all(valid_tmp > params["hib_start_tmp"]):
+        _append_event("prehib", results, 0, len(tmp))
+        results["status"] = "Unhibernation"
+        return _finalize(results, tmp, time)
+
+    tmp, time, seconds = _trim(prepared, params)
+    hib_end = _hib_end_mask(seconds, params, prepared["sorted"])
+    excluded, exclusion_end, _ = _exclusion_mask(seconds, params)
+    state = _state(
+        results,
+        tmp,
+        time,
+        params,
+        _lookup_tables(tmp, params),
+        excluded,
+        exclusion_end,
+        hib_end,
+    )
+    for i in range(len(tmp)):
+        if not _step(state, i):
+            break
+    return _finalize(results, tmp, time, state["excluded"], state["dropped"])
+
+
+def _state(
+        results: dict,
+        tmp: np.ndarray,
+        time: np.ndarray,
+        params: dict,
+        lookup: dict,
+        exclusion: np.ndarray,
+        exclusion_end: np.ndarray,
+        hib_end: np.ndarray) -> dict:
+    """
+    Initializes the state of the sample-by-sample analysis.
+
+    Args:
+        results (dict): The dictionary storing the analysis results.
+        tmp (numpy.ndarray): The temperature data.
+        time (numpy.ndarray): The time data.
+        params (dict): The parameters.
+        lookup (dict): The lookup tables of the recording.
+        exclusion (numpy.ndarray): The mask of the samples skipped for
+        the exclusion periods.
+        exclusion_end (numpy.ndarray): The mask of the first samples after
+        the exclusion periods.
+        hib_end (numpy.ndarray): The mask of the samples at the hibernation
+        end time.
+    Returns:
+        dict: The state of the analysis.
+    """
+    return {
+        "results": results,
+        "tmp": tmp,
+        "time": time,
+        "params": params,
+        "lookup": lookup,
+        "exclusion": exclusion,
+        "exclusion_end": exclusion_end,
+        "hib_end": hib_end,
+        # The processing event is kept as the index of its first sample
+        "previous_tmp": None,
+        "process_start": 0,
+        "excluded": [],
+        "dropped": [],
+    }
+
+
+def _step(state: dict, i: int) -> bool:
+    """
+    Analyzes a sample and updates the state of the analysis.
+
+    Args:
+        state (dict): The state of the analysis.
+        i (int): The index of the sample.
+    Returns:
+        bool: False if the analysis is finished, True otherwise.
+    """
+    results, params, lookup = state["results"], state["params"], state["lookup"]
+    tmp, time = state["tmp"], state["time"]
+    previous_tmp, process_start = state["previous_tmp"], state["process_start"]
+
+    if state["exclusion"][i]:
+        state["excluded"].append(i)
+        return True
+    elif state["exclusion_end"][i]:
+        # The first sample after an exclusion period is dropped
+        state["dropped"].append(i)
+        return True
+    elif i == 0:
+        return True
+    elif state["hib_end"][i]:
+        results["hib_end_idx"] = i
+        return False
+    # For Post-Hibernation
+    elif (
+        results["hib_end_idx"] is not None
+        and time[results["hib_end_idx"]] != time[-1]
+    ):
+        minutes = results["interval"]["minutes"]
+        range_index = (
+            minutes * 24 * 7 if minutes * 24 * 7 <= len(time) else len(time) - 1
+        )
+        # the baseline's N copies of the event are kept on purpose, since
+        # the analysis summary shows their number as the Post-Hibernation count
+        for _ in range(range_index - i):
+            _append_event("posthib", results, process_start, range_index)
+        return False
+    # For Pre-Hibernation
+    elif results["hib_start_idx"] is None:
+        # Check whether the hibernation beginning is accurate
+        if _is_hib_start(lookup, i, params):
+            results["hib_start_idx"] = i + 1
+            if params["hib_start_tmp"] < params["upper_threshold"]:
+                for re_i in range(i, 1, -1):
+                    if tmp[re_i] > params["upper_threshold"]:
+                        previous_tmp = tmp[re_i]
+                        break
+            else:
+                previous_tmp = tmp[i]
+            _append_event("prehib", results, process_start, i + 1)
+            process_start = i + 1
+        else:
+            if len(tmp) <= i + params["hib_start_discrimination"]:
+                # The whole data is used including the exclusion periods
+                _append_event("prehib", results, 0, len(tmp))
+                state["excluded"], state["dropped"] = [], []
+                results["status"] = "Unhibernation"
+                return False
+    elif (
+        results["hib_start_idx"] is not None
+        and params["lower_threshold"] <= tmp[i] < params["upper_threshold"]
+    ):
+        if results["hib_end_idx"] is None and (
+            params["lower_threshold"] > tmp[i - 1]
+            or params["upper_threshold"] <= tmp[i - 1]
+        ):
+            # Check whether the data logger has been taken out
+            if _is_hib_stop(lookup, i):
+                results["hib_end_idx"] = i - 1
+                results["status"] = "Termination"
+                return False
+    elif tmp[i] < params["lower_threshold"]:
+        # Check whether dead
+        if results["hib_end_idx"] is None and _is_dead(lookup, i, params):
+            dead_idx = _get_dead_index(tmp, i, params["dead_discrimination"])
+            results["hib_end_idx"] = i - 1
+            _append_event("DT", results, process_start, i + dead_idx)
+            results["status"] = "Dead"
+            return False
+        # For Cooling
+        elif previous_tmp is not None and previous_tmp >= params["upper_threshold"]:
+            _append_event("Cooling", results, process_start, i)
+            process_start = i
+            previous_tmp = tmp[i - 1]
+        # For Arousal Pending
+        elif previous_tmp is not None and previous_tmp < params["lower_threshold"]:
+            _append_event("Arousal Pending", results, process_start, i)
+            process_start = i
+            previous_tmp = tmp[i - 1]
+
+        # For Deep torpor
+        if i + 1 < len(tmp) and tmp[i + 1] >= params["lower_threshold"]:
+            _append_event("DT", results, process_start, i + 1)
+            process_start = i + 1
+            previous_tmp = tmp[i]
+    elif results["hib_start_idx"] is not None and tmp[i] >= params["upper_threshold"]:
+        # For Shallow Torpor
+        if previous_tmp is not None and previous_tmp >= params["upper_threshold"]:
+            _append_event("ST", results, process_start, i)
+            process_start = i
+            previous_tmp = tmp[i - 1]
+        # For Rewarming
+        elif previous_tmp is not None and previous_tmp < params["lower_threshold"]:
+            _append_event("Rewarming", results, process_start, i)
+            process_start = i
+            previous_tmp = tmp[i - 1]
+        # Check wether the hibernation is over
+        if results["hib_end_idx"] is None and _is_hib_end(lookup, i, params):
+            results["hib_end_idx"] = i - 1
+            results["status"] = "Refractoriness"
+            # The current sample is not a part of the post-hibernation
+            state["dropped"].append(i)
+            if process_start == i:
+                process_start = i + 1
+        # For Periodic Arousal
+        elif i + 1 < len(tmp) and tmp[i + 1] < params["upper_threshold"]:
+            _append_event("PA", results, process_start, i + 1)
+            process_start = i + 1
+            previous_tmp = tmp[i]
+
+    state["previous_tmp"], state["process_start"] = previous_tmp, process_start
+    return True
+
+
+# Temperature bands used by the vectorized engine
+BELOW, IN_BAND, ABOVE = 0, 1, 2
+
+
+def _band_labels(tmp: np.ndarray, params: dict) -> np.ndarray:
+    """
+    Labels each temperature sample with its band: below the lower threshold,
+    in-band, or at/above the upper threshold.
+
+    Args:
+        tmp (numpy.ndarray): The temperature data.
+        params (dict): The parameters.
+    Returns:
+        numpy.ndarray: The band label (BELOW, IN_BAND or ABOVE) of each sample.
+    """
+    bands = np.full(len(tmp), IN_BAND, dtype=np.int8)
+    bands[tmp < params["lower_threshold"]] = BELOW
+    bands[tmp >= params["upper_threshold"]] = ABOVE
+    return bands
+
+
+def _run_boundaries(bands: np.ndarray) -> tuple:
+    """
+    Splits the band labels into runs of consecutive samples in the same band.
+
+    Args:
+        bands (numpy.ndarray): The band label of each sample.
+    Returns:
+        tuple: The start indices and the end indices (exclusive) of each run.
+    """
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(bands)) + 1))
+    ends = np.append(starts[1:], len(bands))
+    return starts, ends
+
+
+def _find_hib_start(lookup: dict, time: np.ndarray, params: dict) -> tuple:
+    """
+    Finds the index where the pre-hibernation loop of _peak_counts stops,
+    and the reason why it stops.
+
+    Args:
+        lookup (dict): The lookup tables of the recording.
+        time (numpy.ndarray): The time data.
+        params (dict): The parameters.
+    Returns:
+        tuple: The index and the reason ("hib_start", "Unhibernation", "hib_end"
+        or None if the recording ends first).
+    """
+    n = len(time)
+    start_point_index = params["hib_start_discrimination"]
+    candidates = []
+    if params["hib_end_index"] is not None:
+        candidates.append((params["hib_end_index"], "hib_end"))
+
+    if start_point_index <= 0:
+        if n > 1:
+            candidates.append((1, "hib_start"))
+    else:
+        # _is_hib_start for every index at once
+        index = np.arange(1, n - start_point_index)
+        found = np.flatnonzero(
+            lookup["next_warm"][index + 1] > index + start_point_index
+        )
+        if len(found) > 0:
+            candidates.append((index[found[0]], "hib_start"))
+    unhib_index = max(1, n - start_point_index)
+    if unhib_index < n:
+        candidates.append((unhib_index, "Unhibernation"))
+
+    if not candidates:
+        return n, None
+    priority = {"hib_end": 0, "hib_start": 1, "Unhibernation": 2}
+    return min(candidates, key=lambda c: (c[0], priority[c[1]]))
+
+
+def _find_hib_stop(
+        lookup: dict,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        run_bands: np.ndarray,
+        hib_index: int,
+        params: dict) -> tuple:
+    """
+    Finds the first index after the beginning of hibernation where one of the
+    hibernation end conditions (the fixed end time, datalogger removal, death or
+    refractoriness) is met.
+
+    Args:
+        lookup (dict): The lookup tables of the recording.
+        starts (numpy.ndarray): The start indices of each run.
+        ends (numpy.ndarray): The end indices (exclusive) of each run.
+        run_bands (numpy.ndarray): The band label of each run.
+        hib_index (int): The first index of the hibernation period.
+        params (dict): The parameters.
+    Returns:
+        tuple: The index and the reason ("hib_end", "Termination", "Dead",
+        "Refractoriness" or None if the recording ends first).
+    """
+    n = len(lookup["next_not_below"])
+    candidates = []
+    if params["hib_end_index"] is not None and params["hib_end_index"] >= hib_index:
+        candidates.append((params["hib_end_index"], "hib_end"))
+
+    # The datalogger removal is only met by the last run
+    if run_bands[-1] == IN_BAND and starts[-1] >= max(hib_index, 1):
+        candidates.append((starts[-1], "Termination"))
+
+    # The conditions are checked at the first sample of each run, since they are
+    # never met later in a run when they are not met at its first sample
+    checks = np.maximum(starts, hib_index)
+    in_hib = ends > hib_index
+
+    dead_window = np.where(
+        n > checks + params["dead_discrimination"],
+        params["dead_discrimination"],
+        n - checks,
+    )
+    dead = (
+        in_hib
+        & (run_bands == BELOW)
+        & (lookup["next_not_below"][checks] >= checks + dead_window)
+    )
+    if dead.any():
+        candidates.append((checks[np.argmax(dead)], "Dead"))
+
+    refractoryness = params["refractoryness_discrimination"]
+    end_window = np.where(
+        n > checks + params["hib_end_discrimination"],
+        params["hib_end_discrimination"],
+        n - checks,
+    )
+    if refractoryness < 0:
+        hib_end = np.ones(len(starts), dtype=bool)
+    elif refractoryness == 0:
+        hib_end = end_window <= 0
+    else:
+        hib_end = lookup["next_streak_end"][checks] > checks + end_window - 2
+    hib_end &= in_hib & (run_bands == ABOVE)
+    if hib_end.any():
+        candidates.append((checks[np.argmax(hib_end)], "Refractoriness"))
+
+    if not candidates:
+        return n, None
+    return min(candidates, key=lambda c: (c[0], c[1] != "hib_end"))
+
+
+def _peak_counts_vectorized(
+        tmp: list,
+        time: list,
+        params: dict,
+        prepared: dict = None) -> dict:
+    """
+    Detects changes in hibernation status and analyzes the duration of each status
+    in the same way as _peak_counts, but labels every sample with NumPy and builds
+    the events from the boundaries of the temperature band runs instead of walking
+    each sample.
+
+    Args:
+        tmp (list): The temperature data.
+        time (list): The time data.
+        params (dict): The parameters.
+        prepared (dict): The data preprocessed by _prepare.
+        If None, it is computed from the data.
+    Returns:
+        dict: The dictionary storing the analysis results.
+    Note:
+        Recordings including NaN temperature, unsorted time or exclusion periods
+        are analyzed by _peak_counts.
+    """
+    prepared = prepared or _prepare(tmp, time, params)
+    tmp, time = prepared["tmp"], prepared["time"]
+    if (
+        np.isnan(tmp).any()
+        or not prepared["sorted"]
+        or np.any(np.diff(prepared["seconds"]) == 0)
+        or params["exclusion_periods"]
+    ):
+        return _peak_counts(tmp, time, params, prepared)
+
+    results = _structured()
+    interval = prepared["interval"]
+    params = _modify_discrimination_to_interval(interval["minutes"], params)
+    results |= {
+        "interval": interval,
+        "ID": params["id"],
+        "group": params["group"],
+    }
+
+    # For Non-Hibernation
+    if len(tmp) > 0 and np.all(tmp > params["hib_start_tmp"]):
+        _append_event("prehib", results, 0, len(tmp))
+        results["status"] = "Unhibernation"
+        return _finalize(results, tmp, time)
+
+    tmp, time, seconds = _trim(prepared, params)
+    params["hib_end_index"] = None
+    if params["hib_end_time"] is not None:
+        params["hib_end_index"] = _get_end_index(seconds, params["hib_end_time"], True)
+
+    # For Pre-Hibernation
+    lookup = _lookup_tables(tmp, params)
+    index, reason = _find_hib_start(lookup, time, params)
+    if reason == "hib_end":
+        results["hib_end_idx"] = index
+        return _finalize(results, tmp, time)
+    elif reason == "Unhibernation":
+        _append_event("prehib", results, 0, len(tmp))
+        results["status"] = "Unhibernation"
+        return _finalize(results, tmp, time)
+    elif reason is None:
+        return _finalize(results, tmp, time)
+
+    results["hib_start_idx"] = index + 1
+    _append_event("prehib", results, 0, index + 1)
+
+    bands = _band_labels(tmp, params)
+    if params["hib_start_tmp"] < params["upper_threshold"]:
+        warm = np.flatnonzero(tmp[2:index + 1] > params["upper_threshold"])
+        previous = ABOVE if len(warm) > 0 else IN_BAND
+    else:
+        previous = bands[index]
+
+    starts, ends = _run_boundaries(bands)
+    run_bands = bands[starts]
+    hib_index = index + 1
+    stop_index, reason = _find_hib_stop(
+        lookup, starts, ends, run_bands, hib_index, params
+    )
+
+    n = len(tmp)
+    event_names = {
+        BELOW: {ABOVE: "Cooling", BELOW: "Arousal Pending"},
+        ABOVE: {ABOVE: "ST", BELOW: "Rewarming"},
+    }
+    close_names = {BELOW: "DT", ABOVE: "PA"}
+    process_start = hib_index
+    first_run = np.searchsorted(starts, hib_index, side="right") - 1
+    last_run = np.searchsorted(starts, stop_index, side="right")
+    for run in range(first_run, last_run):
+        band = run_bands[run]
+        start = max(starts[run], hib_index)
+        end = min(ends[run], stop_index)
+        if band == IN_BAND:
+            continue
+        # For Cooling, Arousal Pending, Shallow Torpor and Rewarming
+        i = start
+        while i < end and previous != IN_BAND:
+            _append_event(event_names[band][previous], results, process_start, i)
+            process_start = i
+            previous = bands[i - 1]
+            i += 1
+        # For Deep torpor and Periodic Arousal
+        if end == ends[run] < n:
+            _append_event(close_names[band], results, process_start, end)
+            process_start = end
+            previous = band
+
+    if reason == "hib_end":
+        results["hib_end_idx"] = stop_index
+        return _finalize(results, tmp, time)
+    elif reason is None:
+        return _finalize(results, tmp, time)
+
+    results["hib_end_idx"] = stop_index - 1
+    results["status"] = reason
+    if reason == "Dead":
+        dead_idx = _get_dead_index(tmp, stop_index, params["dead_discrimination"])
+        _append_event("DT", results, process_start, stop_index + dead_idx)
+    elif reason == "Refractoriness":
+        if previous != IN_BAND:
+            _append_event(
+                event_names[ABOVE][previous], results, process_start, stop_index
+            )
+        # The current sample is not a part of the post-hibernation
+        dropped = [stop_index]
+        if previous != IN_BAND or process_start == stop_index:
+            process_start = stop_index + 1
+
+        # For Post-Hibernation
+        posthib_index = stop_index + 1
+        if posthib_index >= n:
+            return _finalize(results, tmp, time, dropped=dropped)
+        elif params["hib_end_index"] == posthib_index:
+            results["hib_end_idx"] = posthib_index
+            return _finalize(results, tmp, time, dropped=dropped)
+        range_index = (
+            interval["minutes"] * 24 * 7
+            if interval["minutes"] * 24 * 7 <= n
+            else n - 1
+        )
+        # the N copies are kept as in _step
+        for _ in range(range_index - posthib_index):
+            _append_event("posthib", results, process_start, range_index)
+        return _finalize(results, tmp, time, dropped=dropped)
+    return _finalize(results, tmp, time)
+
+
+def _event_ranges(results: dict, event_name: str) -> list:
+    """
+    Picks up the events of the specified name from the event table.
+
+    Args:
+        results (dict): The dictionary storing the analysis results.
+        event_name (str): The name of the event (e.g., 'PA', 'ST', 'DT').
+    Returns:
+        list: The [start_idx, end_idx] of each event in the order of event number.
+    """
+    events = results["events"]
+    events = events[events["event_code"] == EVENT_NAMES.index(event_name)]
+    return events[["start_idx", "end_idx"]].tolist()
+
+
+def _replace_events(results: dict, event_ranges: dict) -> None:
+    """
+    Replaces the events of the specified names in the event table,
+    renumbering them in the order of the given ranges.
+
+    Args:
+        results (dict): The dictionary storing the analysis results.
+        event_ranges (dict): The [start_idx, end_idx] of each event keyed by
+        event name.
+    """
+    codes = [EVENT_NAMES.index(name) for name in event_ranges]
+    events = [
+        (code, start, end)
+        for code, _, start, end in results["events"].tolist()
+        if code not in codes
+    ]
+    for code, ranges in zip(codes, event_ranges.values()):
+        events += [(code, start, end) for start, end in ranges]
+    results["events"] = _event_table(events)
+
+
+def modify_pa(results: dict, pa_discrimination: int) -> dict:
+    """
+    Modifies the PA (Periodic Arousal) events to ensure accurate classification.
+    It addresses the issue where temporary ST (Shallow Torpor) events are incorrectly
+    mixed with PA events occurring during the normal temperature state.
+
+    Args:
+        results (dict): The dictionary storing the analysis results.
+        pa_discrimination (int):
+    Returns:
+        dict: The dictionary storing the analysis results.
+    """
+    interval = np.timedelta64(results["interval"]["minutes"], "m")
+    time = _masked_data(results, "time")
+    st_events = _event_ranges(results, "ST")
+    skipped = _left_out(results, EVENT_NAMES.index("ST"))
+
+    # The short ST events keyed by their start time in the order of ST events
+    st_by_start = {}
+    for st_num, (st_start, st_end) in enumerate(st_events):
+        # the samples left out are not points of the event
+        lower, upper = np.searchsorted(skipped, [st_start, st_end])
+        points = st_end - st_start - (upper - lower)
+        if points < pa_discrimination and not np.isnat(time[st_start]):
+            st_by_start.setdefault(time[st_start], deque()).append(st_num)
+
+    st_keys_set = set()
+    temp_pa = []
+    for pa_start, pa_end in _event_ranges(results, "PA"):
+        # The first unused ST starting one interval after the PA ends
+        st_nums = st_by_start.get(time[pa_end - 1] + interval)
+        if st_nums:
+            st_num = st_nums.popleft()
+            temp_pa.append([pa_start, st_events[st_num][1]])
+            st_keys_set.add(st_num)
+        else:
+            temp_pa.append([pa_start, pa_end])
+
+    remaining_st = [
+        st for st_num, st in enumerate(st_events) if st_num not in st_keys_set
+    ]
+
+    merge_pa = []
+    for new_pa in temp_pa:
+        if len(merge_pa) == 0:
+            merge_pa.append(new_pa)
+        elif time[merge_pa[-1][1] - 1] + interval == time[new_pa[0]]:
+            merge_pa[-1][1] = new_pa[1]
+        else:
+            merge_pa.append(new_pa)
+
+    _replace_events(results, {"PA": merge_pa, "ST": remaining_st})
+    return results
+
+
+def get_low_tb_events(results: dict, prehib_low_Tb_threshold: int) -> dict:
+    """
+    Extracts events where the body temperature falls below a predefined threshold
+    during the pre-hibernation period.
+
+    Args:
+        results (dict): The dictionary storing the analysis results.
+        prehib_low_Tb_threshold (int): The parameters.
+    Returns:
+        dict: The dictionary storing the analysis results.
+    """
+    prehib = _event_ranges(results, "prehib")
+    if len(prehib) == 0:
+        return results
+
+    offset, end = prehib[0]
+    # the dropped samples are not points of the pre-hibernation period
+    positions = np.setdiff1d(
+        np.arange(offset, end), results["data"]["dropped"], assume_unique=True
+    )
+    tmp = _masked_data(results, "tmp", offset, end)[positions - offset]
+    # the last point only closes an event
+    low = np.flatnonzero(tmp[:-1] < prehib_low_Tb_threshold)
+    # an event ends at the falling edge, where a low point is followed
+    # by a point at or above the threshold (a missing point does not end it)
+    ends = np.flatnonzero(
+        (tmp[:-1] < prehib_low_Tb_threshold) & (tmp[1:] >= prehib_low_Tb_threshold)
+    ) + 1
+    # and starts at the first low point after the previous event
+    starts = low[np.searchsorted(low, np.concatenate(([0], ends))[:-1])]
+    low_tb = np.column_stack((positions[starts], positions[ends - 1] + 1))
+    _replace_events(results, {"low_Tb": low_tb.tolist()})
+
+    # the points of an event not below the threshold are left out of it
+    inside = np.cumsum(
+        np.bincount(starts, minlength=len(tmp) + 1)
+        - np.bincount(ends, minlength=len(tmp) + 1)
+    )[:-1] > 0
+    skipped = positions[np.flatnonzero(inside & ~(tmp < prehib_low_Tb_threshold))]
+    results["data"]["skipped"] = np.union1d(results["data"]["skipped"], skipped)
+    return results
+
+
+ENGINES = {
+    "loop": _peak_counts,
+    "vectorized": _peak_counts_vectorized,
+}
+
+
+def _analyze_arrays(
+        param_list: list,
+        tmp: np.ndarray,
+        time: np.ndarray,
+        engine: str = "loop",
+        prepared: dict = None) -> dict:
+    """
+    Performs the analysis on the temperature and time arrays and returns
+    the results with the event table only.
+
+    Args:
+        param_list (list): The list containing the model's parameter set.
+        tmp (numpy.ndarray): The temperature data.
+        time (numpy.ndarray): The time data.
+        engine (str): The name of the event segmentation engine
+        ("loop" or "vectorized").
+        prepared (dict): The data preprocessed by _prepare.
+    Returns:
+        dict: The dictionary storing the analysis results.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown analysis engine: {engine}")
     params = _data_set(param_list)
-    res = _peak_counts(tmp, time, params)
-    if res["tmp"]["PA"]:
-        res = modify_pa(res, params["pa_discrimination"])
-    if res["tmp"]["prehib"]:
-        res = get_low_tb_events(res, params["prehib_low_Tb_threshold"])
+    with timing.stage("segmentation", engine=engine):
+        res = ENGINES[engine](tmp, time, params, prepared)
+        timing.count("samples", len(tmp))
+        timing.count("events", len(res["events"]))
+    return _modify_events(res, params)
+
+
+def _modify_events(res: dict, params: dict) -> dict:
+    """
+    Merges the PA events with the short ST events following them and extracts
+    the low Tb events of the pre-hibernation period.
+
+    Args:
+        res (dict): The dictionary storing the analysis results.
+        params (dict): The parameters used in the analysis.
+    Returns:
+        dict: The dictionary storing the analysis results.
+    """
+    if _event_ranges(res, "PA"):
+        with timing.stage("modify_pa"):
+            res = modify_pa(res, params["pa_discrimination"])
+    if _event_ranges(res, "prehib"):
+        with timing.stage("get_low_tb_events"):
+            res = get_low_tb_events(res, params["prehib_low_Tb_threshold"])
     return res
+
+
+def _analyze_seasons(
+        param_list: list,
+        tmp: np.ndarray,
+        time: np.ndarray,
+        engine: str = "loop") -> list:
+    """
+    Analyzes every hibernation season of a recording in one pass.
+    The preprocessing is done once, and each season is analyzed from where
+    the previous one ended: when a hibernation ends by refractoriness or at
+    the hibernation end time, the next season starts with its pre-hibernation
+    period at the following sample. The hibernation end time only applies to
+    the first season. The period between two hibernations is the
+    pre-hibernation period of the next season, and a trailing period without
+    hibernation is the post-hibernation period of the last season
+    (see _link_posthib).
+
+    Args:
+        param_list (list): The list containing the model's parameter set.
+        tmp (numpy.ndarray): The temperature data.
+        time (numpy.ndarray): The time data.
+        engine (str): The name of the event segmentation engine.
+    Returns:
+        list: The dictionary storing the analysis results of each season,
+        with its number under "season".
+    """
+    whole = _prepare(tmp, time, _data_set(param_list))
+    prepared, seasons, offsets = whole, [], []
+    while True:
+        res = _analyze_arrays(param_list, tmp, time, engine, prepared)
+        offset = len(whole["time"]) - len(res["data"]["time"])
+        if seasons and res["status"] == "Unhibernation":
+            _link_posthib(seasons[-1], offsets[-1], len(whole["time"]))
+            break
+        if seasons:
+            _link_posthib(seasons[-1], offsets[-1], offset)
+        res["season"] = len(seasons) + 1
+        seasons.append(res)
+        offsets.append(offset)
+
+        if res["hib_end_idx"] is None or res["status"] in ["Dead", "Termination"]:
+            break
+        next_start = offset + res["hib_end_idx"] + 1
+        if next_start >= len(whole["time"]):
+            break
+        prepared = whole | {
+            "tmp": whole["tmp"][next_start:],
+            "time": whole["time"][next_start:],
+            "seconds": whole["seconds"][next_start:],
+            "start_index": 0,
+        }
+        param_list = dict(param_list) | {"hib_end_time": np.nan}
+    return seasons
+
+
+def _link_posthib(previous: dict, previous_offset: int, offset: int) -> None:
+    """
+    Replaces the post-hibernation events of a season with the events lasting until
+    the sample before the next season, or before the last sample of the data as in
+    the analysis of a single season. As in the engines, the event is repeated once
+    per sample after the hibernation end. A season followed by another one has no
+    post-hibernation events, since the next season starts with its
+    pre-hibernation period right after the hibernation end.
+
+    Args:
+        previous (dict): The dictionary storing the analysis results of the season.
+        previous_offset (int): The index where the data of the season starts.
+        offset (int): The index where the data of the next season starts,
+        or the length of the data if there is no next season.
+    """
+    # the sample where the refractoriness is detected is not counted
+    first = previous["hib_end_idx"] + 1
+    first += first in previous["data"]["dropped"]
+    posthib = _event_ranges(previous, "posthib")
+    start = posthib[0][0] if posthib else first
+    end = offset - 1 - previous_offset
+    ranges = [[start, end]] * (end - first) if start < end else []
+    _replace_events(previous, {"posthib": ranges})
+
+
+def _recording_arrays(data) -> tuple:
+    """
+    Picks up the temperature and time arrays of a recording. The arrays may be
+    memory-mapped (see store), and are read only as far as the analysis needs.
+
+    Args:
+        data (pandas.DataFrame or dict): The input data containing temperature
+        and time information, or its "Value" and "Date/Time" arrays.
+    Returns:
+        tuple: The temperature data and the time data.
+    """
+    return (
+        np.asarray(data["Value"], dtype=np.float64),
+        np.asarray(data["Date/Time"]),
+    )
+
+
+def analyze(
+        param_list: list,
+        data: pd.DataFrame,
+        engine: str = "loop",
+        use_cache: bool = True) -> dict:
+    """
+    The main function that performs the analysis.
+    It preprocesses the data, analyzes the hibernation status,
+    and modifies the results. The results are cached by the content of the data
+    and the parameters, so that a repeated analysis returns immediately.
+
+    Args:
+        param_list (list): The list containing the model's parameter set.
+        data (pandas.DataFrame or dict): The input data containing temperature
+        and time information, or its "Value" and "Date/Time" arrays.
+        engine (str): The name of the event segmentation engine
+        ("loop" or "vectorized").
+        use_cache (bool): Whether the result cache is used. The benchmarks
+        turn it off to time the analysis itself.
+    Returns:
+        dict: The dictionary storing the analysis results, with the records of
+        the timed stages under "timings" when the timing is turned on.
+    """
+    return _analyze_cached(
+        param_list, *_recording_arrays(data), engine, use_cache=use_cache
+    )[0]
+
+
+def analyze_seasons(
+        param_list: list,
+        data: pd.DataFrame,
+        engine: str = "loop",
+        use_cache: bool = True) -> list:
+    """
+    Performs the analysis of every hibernation season of a multi-year recording
+    in one pass (see _analyze_seasons). The results are cached as in analyze.
+
+    Args:
+        param_list (list): The list containing the model's parameter set.
+        data (pandas.DataFrame or dict): The input data containing temperature
+        and time information, or its "Value" and "Date/Time" arrays.
+        engine (str): The name of the event segmentation engine
+        ("loop" or "vectorized").
+        use_cache (bool): Whether the result cache is used.
+    Returns:
+        list: The dictionary storing the analysis results of each season,
+        with its number under "season".
+    """
+    return _analyze_cached(
+        param_list, *_recording_arrays(data), engine, True, use_cache
+    )
+
+
+def _analyze_cached(
+        param_list: list,
+        tmp: np.ndarray,
+        time: np.ndarray,
+        engine: str,
+        seasons: bool = False,
+        use_cache: bool = True) -> list:
+    """
+    Looks up the results in the result cache, or performs the analysis
+    and caches its results.
+
+    Args:
+        param_list (list): The list containing the model's parameter set.
+        tmp (numpy.ndarray): The temperature data.
+        time (numpy.ndarray): The time data.
+        engine (str): The name of the event segmentation engine.
+        seasons (bool): Whether every hibernation season is analyzed.
+        use_cache (bool): Whether the result cache is used.
+    Returns:
+        list: The dictionary storing the analysis results of each season
+        (only one unless the seasons are analyzed).
+    """
+    key, cached = None, None
+    if use_cache:
+        key = _result_key(param_list, tmp, time, engine, seasons)
+        cached = _cached_results(key)
+    if cached is None:
+        cached = _analyze_worker(
+            param_list, tmp, time, engine, timed=timing.is_enabled(), seasons=seasons
+        )
+        _cache_results(key, cached)
+    return [_attach_arrays(offset, res, tmp, time) for offset, res in cached]
+
+
+def _result_key(
+        param_list: list,
+        tmp: np.ndarray,
+        time: np.ndarray,
+        engine: str,
+        seasons: bool = False) -> str:
+    """
+    Computes the key of the result cache from the data and the normalized
+    parameters.
+
+    Args:
+        param_list (list): The list containing the model's parameter set.
+        tmp (numpy.ndarray): The temperature data.
+        time (numpy.ndarray): The time data.
+        engine (str): The name of the event segmentation engine.
+        seasons (bool): Whether every hibernation season is analyzed.
+    Returns:
+        str: The key, or None if the results are not cached
+        (the analysis reports the error of invalid parameters).
+    """
+    try:
+        params = _data_set(param_list)
+    except Exception:
+        return None
+    return cache.result_key(
+        tmp, time, params, f"{engine}:seasons" if seasons else engine
+    )
+
+
+def _cached_results(key: str, file: str = None):
+    """
+    Looks up the results of an analysis in the result cache.
+
+    Args:
+        key (str): The key of the result cache.
+        file (str): The file name labelling the timed stage.
+    Returns:
+        list: The index where the analyzed arrays start in the given data,
+        and the dictionary storing the analysis results, of each season,
+        or None if they are not cached.
+    """
+    with timing.stage("cache_lookup", file=file):
+        cached = cache.get(key)
+        timing.count("hits", cached is not None)
+    return cached
+
+
+def _cache_results(key: str, cached: list) -> None:
+    """
+    Stores the results of an analysis without the records of the timed stages.
+
+    Args:
+        key (str): The key of the result cache.
+        cached (list): The index where the analyzed arrays start in the given data,
+        and the dictionary storing the analysis results, of each season.
+    """
+    cache.put(
+        key,
+        [
+            (offset, {k: v for k, v in res.items() if k != "timings"})
+            for offset, res in cached
+        ],
+    )
+
+
+def _attach_arrays(
+        offset: int,
+        res: dict,
+        tmp: np.ndarray,
+        time: np.ndarray,
+        file: str = None) -> dict:
+    """
+    Attaches the analyzed arrays to the results returned without them and builds
+    the event dictionaries.
+
+    Args:
+        offset (int): The index where the analyzed arrays start in the given data.
+        res (dict): The dictionary storing the analysis results.
+        tmp (numpy.ndarray): The temperature data.
+        time (numpy.ndarray): The time data.
+        file (str): The file name labelling the timed stages.
+    Returns:
+        dict: The dictionary storing the analysis results.
+    """
+    res["data"]["tmp"] = np.asarray(tmp, dtype=np.float64)[offset:]
+    res["data"]["time"] = time[offset:]
+    timed = timing.is_enabled()
+    if timed:
+        res.setdefault("timings", [])
+        timing.extend(res["timings"])
+    with timing.stage("event_dict", file=file) as record:
+        res |= event_dict(res)
+    if timed:
+        res["timings"].append(record)
+    return res
+
+
+def _analyze_worker(
+        param_list: list,
+        tmp: np.ndarray,
+        time: np.ndarray,
+        engine: str,
+        file: str = None,
+        timed: bool = False,
+        seasons: bool = False) -> list:
+    """
+    Performs the analysis in a worker process. The analyzed arrays are
+    dropped from the results since the caller already holds them.
+
+    Args:
+        param_list (list): The list containing the model's parameter set.
+        tmp (numpy.ndarray): The temperature data.
+        time (numpy.ndarray): The time data.
+        engine (str): The name of the event segmentation engine.
+        file (str): The file name labelling the timed stages.
+        timed (bool): Whether the stages are timed.
+        seasons (bool): Whether every hibernation season is analyzed.
+    Returns:
+        list: The index where the analyzed arrays start in the given data,
+        and the dictionary storing the analysis results, of each season
+        (only one unless the seasons are analyzed). The records of the timed
+        stages are stored in the results of the first season.
+    """
+    with timing.collecting(timed) as records:
+        with timing.stage("analyze", file=file):
+            if seasons:
+                results = _analyze_seasons(param_list, tmp, time, engine)
+            else:
+                results = [_analyze_arrays(param_list, tmp, time, engine)]
+    if timed:
+        results[0]["timings"] = records
+    stripped = []
+    for res in results:
+        offset = len(time) - len(res["data"].pop("time"))
+        del res["data"]["tmp"]
+        stripped.append((offset, res))
+    return stripped
+
+
+def _run_tasks(
+        function,
+        tasks: dict,
+        max_workers: int = None,
+        initializer=None,
+        initargs: tuple = ()) -> tuple:
+    """
+    Runs a function with the arguments of each task in a process pool,
+    or in this process when a single worker is enough.
+    An error in one task does not stop the others.
+
+    Args:
+        function (callable): The function run by the workers.
+        tasks (dict): The arguments of each task.
+        max_workers (int): The number of worker processes.
+        If None, ANALYSIS_MAX_WORKERS is used.
+        initializer (callable): The function run once by each worker.
+        initargs (tuple): The arguments of the initializer.
+    Returns:
+        tuple: The results and the exceptions of the tasks, by their keys.
+    """
+    max_workers = (
+        max_workers
+        or ANALYSIS_MAX_WORKERS
+        or min(os.cpu_count() or 1, DEFAULT_MAX_WORKERS)
+    )
+    max_workers = min(max_workers, len(tasks))
+    results, errors = {}, {}
+    if max_workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for key, args in tasks.items():
+            try:
+                results[key] = function(*args)
+            except Exception as e:
+                errors[key] = e
+        return results, errors
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=initializer, initargs=initargs
+    ) as executor:
+        futures = {key: executor.submit(function, *args) for key, args in tasks.items()}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                errors[key] = e
+    return results, errors
+
+
+def analyze_many(
+        parameters_dict: dict,
+        data: dict,
+        max_workers: int = None,
+        engine: str = "loop",
+        seasons: bool = False) -> tuple:
+    """
+    Analyzes the data of multiple files in parallel with a process pool.
+    Only the temperature and time arrays are sent to the workers,
+    and an error in one file does not stop the analysis of the others.
+    The files whose results are in the result cache are not analyzed again.
+
+    Args:
+        parameters_dict (dict): The parameter set of each file.
+        data (dict): The input data (pandas.DataFrame, or the dict of its "Value"
+        and "Date/Time" arrays) of each file.
+        max_workers (int): The number of worker processes.
+        If None, ANALYSIS_MAX_WORKERS is used.
+        engine (str): The name of the event segmentation engine
+        ("loop" or "vectorized").
+        seasons (bool): Whether every hibernation season is analyzed
+        (see _analyze_seasons).
+    Returns:
+        tuple: The analysis results of each file (the list of the results of each
+        season if the seasons are analyzed) in the order of the data,
+        and the error messages of the failed files. When the timing is turned on,
+        the results of each file hold the records of its stages under "timings".
+    """
+    timed = timing.is_enabled()
+    files = [file for file in data if file in parameters_dict]
+    arrays = {file: _recording_arrays(data[file]) for file in files}
+    keys, results, errors = {}, {}, {}
+    for file in files:
+        keys[file] = _result_key(
+            parameters_dict[file], *arrays[file], engine, seasons
+        )
+        cached = _cached_results(keys[file], file)
+        if cached is not None:
+            results[file] = cached
+    pending = [file for file in files if file not in results]
+
+    tasks = {
+        file: (parameters_dict[file], *arrays[file], engine, file, timed, seasons)
+        for file in pending
+    }
+    analyzed, failed = _run_tasks(_analyze_worker, tasks, max_workers)
+    results |= analyzed
+    for file, e in failed.items():
+        print("".join(traceback.format_exception(e)))
+        print(f"Analysis error in {file}: {str(e)}")
+        errors[file] = str(e)
+
+    for file in analyzed:
+        _cache_results(keys[file], analyzed[file])
+    attached = {}
+    for file in files:
+        if file in results:
+            attached[file] = [
+                _attach_arrays(offset, res, *arrays[file], file)
+                for offset, res in results[file]
+            ]
+            if not seasons:
+                attached[file] = attached[file][0]
+    return attached, errors
+
+
+# The parameters which the preprocessing of the sweep depends on
+SWEEP_FIXED_PARAMETERS = ["file_name", "ID", "group", "prehib_start_time"]
+
+# The preprocessed data shared by the tasks of a sweep worker process
+_sweep_prepared = None
+
+
+def _init_sweep_worker(prepared: dict) -> None:
+    """
+    Stores the preprocessed data in the sweep worker process once,
+    so that each task only receives its parameter set.
+
+    Args:
+        prepared (dict): The data preprocessed by _prepare.
+    """
+    global _sweep_prepared
+    _sweep_prepared = prepared
+
+
+def _event_summary(results: dict) -> list:
+    """
+    Counts the events and sums up their durations. The duration of an event is
+    the time between its first and last points, or the interval for
+    a single point event, as written by filer.save_artifacts.
+
+    Args:
+        results (dict): The dictionary storing the analysis results.
+    Returns:
+        list: The rows of event name, event count and total duration in seconds.
+    """
+    time = results["data"]["time"]
+    events = results["events"]
+    durations = (
+        time[np.maximum(events["end_idx"] - 1, events["start_idx"])]
+        - time[events["start_idx"]]
+    ).astype("timedelta64[s]").astype(np.int64)
+    durations[events["end_idx"] - events["start_idx"] == 1] = results["interval"][
+        "seconds"
+    ]
+
+    rows = []
+    for code, name in enumerate(EVENT_NAMES):
+        selected = events["event_code"] == code
+        rows.append([name, int(selected.sum()), int(durations[selected].sum())])
+    if None not in [results["hib_start_idx"], results["hib_end_idx"]]:
+        hibernation = time[results["hib_end_idx"]] - time[results["hib_start_idx"]]
+        rows.append(
+            ["hibernation", 1, int(hibernation.astype("timedelta64[s]").astype(int))]
+        )
+    return rows
+
+
+def _sweep_worker(param_list: dict, engine: str) -> dict:
+    """
+    Analyzes the preprocessed data of the sweep worker with a parameter set.
+
+    Args:
+        param_list (dict): The parameter set.
+        engine (str): The name of the event segmentation engine.
+    Returns:
+        dict: The status and the event summary of the analysis.
+    """
+    prepared = _sweep_prepared
+    res = _analyze_arrays(
+        param_list, prepared["tmp"], prepared["time"], engine, prepared
+    )
+    return {"status": res["status"], "events": _event_summary(res)}
+
+
+def sweep(
+        param_list: dict,
+        data: pd.DataFrame,
+        grid,
+        max_workers: int = None,
+        engine: str = "loop") -> pd.DataFrame:
+    """
+    Analyzes one recording with each parameter set of a grid in parallel.
+    The datetime conversion, the time interval and the trimming to
+    the pre-hibernation start time are done only once for the whole grid.
+
+    Args:
+        param_list (dict): The base parameter set of the recording.
+        data (pandas.DataFrame or dict): The input data containing temperature
+        and time information, or its "Value" and "Date/Time" arrays.
+        grid (dict or list): The values of each swept parameter
+        (e.g., {"upper_threshold": [33, 35], "pa_discrimination": [60, 120]}),
+        whose combinations are analyzed, or the list of parameter sets
+        overriding the base parameter set.
+        max_workers (int): The number of worker processes.
+        If None, ANALYSIS_MAX_WORKERS is used.
+        engine (str): The name of the event segmentation engine
+        ("loop" or "vectorized").
+    Returns:
+        pandas.DataFrame: The table of the event count and the total duration
+        in seconds of each event for each parameter set. The swept parameters,
+        "status" and "error" are given as columns.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown analysis engine: {engine}")
+    if isinstance(grid, dict):
+        grid = [
+            dict(zip(grid.keys(), values))
+            for values in itertools.product(*grid.values())
+        ]
+    swept = list(dict.fromkeys(name for overrides in grid for name in overrides))
+    fixed = [name for name in swept if name in SWEEP_FIXED_PARAMETERS]
+    if fixed:
+        raise ValueError(f"Cannot sweep {', '.join(fixed)}.")
+
+    tmp, time = _recording_arrays(data)
+    prepared = _prepare(tmp, time.astype("datetime64[s]"), _data_set(param_list))
+    param_sets = [dict(param_list) | overrides for overrides in grid]
+    summaries, failed = _run_tasks(
+        _sweep_worker,
+        {i: (params, engine) for i, params in enumerate(param_sets)},
+        max_workers,
+        initializer=_init_sweep_worker,
+        initargs=(prepared,),
+    )
+    summaries |= {i: {"error": str(e)} for i, e in failed.items()}
+
+    rows = []
+    for i, overrides in enumerate(grid):
+        values = [overrides.get(name, param_list.get(name)) for name in swept]
+        if "error" in summaries[i]:
+            rows.append(values + ["", None, None, None, summaries[i]["error"]])
+            continue
+        for event in summaries[i]["events"]:
+            rows.append(values + [summaries[i]["status"]] + event + [None])
+    return pd.DataFrame(
+        rows, columns=swept + ["status", "event", "count", "duration", "error"]
+    )
+
+
+class _GrowingArray:
+    """
+    An array extended in place, whose capacity doubles when it is full
+    so that appending a chunk costs time proportional to the chunk.
+    """
+
+    def __init__(self, dtype):
+        self._data = np.empty(1024, dtype=dtype)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def view(self) -> np.ndarray:
+        return self._data[: self._size]
+
+    def extend(self, values: np.ndarray) -> None:
+        size = self._size + len(values)
+        if size > len(self._data):
+            data = np.empty(max(size, 2 * len(self._data)), dtype=self._data.dtype)
+            data[: self._size] = self.view
+            self._data = data
+        self._data[self._size:size] = values
+        self._size = size
+
+
+class _StreamIndex:
+    """
+    The next True index of a mask over the samples received so far.
+    It is used in place of a lookup table of _lookup_tables, answering
+    the length of the received samples when no True index is found yet.
+    """
+
+    def __init__(self):
+        self._positions = _GrowingArray(np.int64)
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> int:
+        positions = self._positions.view
+        found = np.searchsorted(positions, index)
+        return positions[found] if found < len(positions) else self._length
+
+    def extend(self, mask: np.ndarray) -> None:
+        self._positions.extend(np.flatnonzero(mask) + self._length)
+        self._length += len(mask)
+
+
+class IncrementalAnalyzer:
+    """
+    Analyzes a recording received in chunks, e.g. from a live telemetry feed,
+    with the state machine of _peak_counts. Each sample is analyzed once the
+    samples needed by its lookahead checks (hibernation start, death, hibernation
+    end and datalogger removal) have arrived, so that a chunk costs time
+    proportional to its length. The events are emitted as soon as they are
+    finalized, and close() returns the same results as analyze().
+
+    The time of the received data must increase. The emitted events are those
+    of the segmentation; the merge of the PA and ST events and the low Tb events
+    are given by close(). The analysis uses the most frequent interval of the
+    received samples, as analyze() does for the whole recording. When a chunk
+    changes it, e.g. after a gap at the start of the recording, the analysis
+    restarts with the new interval, and the events are emitted again from the
+    first one.
+
+    Args:
+        param_list (dict): The model's parameter set.
+    """
+
+    def __init__(self, param_list: dict):
+        self._param_list = param_list
+        self._tmp = _GrowingArray(np.float64)
+        self._time = _GrowingArray("datetime64[s]")
+        self._intervals = {}
+        self._closed = False
+        self._valid = False
+        self._cold = False
+        self._restart()
+
+    def _restart(self) -> None:
+        """
+        Resets the analysis of the received samples, which is done again
+        by the next _prepare and _advance.
+        """
+        self.params = _data_set(self._param_list)
+        self._exclusion = _GrowingArray(bool)
+        self._exclusion_end = _GrowingArray(bool)
+        self._hib_end = _GrowingArray(bool)
+        self._results = _structured() | {
+            "ID": self.params["id"],
+            "group": self.params["group"],
+        }
+        self._state = None
+        self._start_index = None
+        self._hib_end_found = self.params["hib_end_time"] is None
+        self._exclusion_active = None
+        self._lookup_length = 0
+        self._streak = 0
+        self._next_sample = 0
+        self._finished = False
+        self._error = None
+        self._emitted = 0
+        self._counts = np.zeros(len(EVENT_NAMES), dtype=np.int32)
+
+    @property
+    def data(self) -> dict:
+        """
+        dict: The temperature ("tmp") and time ("time") data from the
+        pre-hibernation start time, which the indices of the events point into.
+        """
+        start_index = self._start_index or 0
+        return {
+            "tmp": self._tmp.view[start_index:],
+            "time": self._time.view[start_index:],
+        }
+
+    def update(self, tmp: list, time: list) -> np.ndarray:
+        """
+        Appends a chunk of the recording and analyzes the samples which
+        can be decided.
+
+        Args:
+            tmp (list): The temperature data of the chunk.
+            time (list): The time data of the chunk.
+        Returns:
+            numpy.ndarray: The event table (EVENT_DTYPE) of the newly finalized
+            events, whose indices point into the data property.
+        """
+        if self._closed:
+            raise ValueError("The analyzer is already closed.")
+        tmp = np.asarray(tmp, dtype=np.float64)
+        time = np.asarray(time, dtype="datetime64[s]")
+        if len(tmp) != len(time):
+            raise ValueError("The temperature and time data differ in length.")
+        previous = self._time.view[-1:]
+        if np.any(np.diff(np.concatenate((previous, time))) <= np.timedelta64(0)):
+            raise ValueError("The time of the appended data must increase.")
+
+        self._tmp.extend(tmp)
+        self._time.extend(time)
+        intervals, counts = np.unique(
+            np.diff(np.concatenate((previous, time)).view(np.int64)),
+            return_counts=True,
+        )
+        for interval, count in zip(intervals.tolist(), counts.tolist()):
+            self._intervals[interval] = self._intervals.get(interval, 0) + count
+        valid_tmp = tmp[~np.isnan(tmp)]
+        self._valid |= len(valid_tmp) > 0
+        self._cold |= bool(np.any(valid_tmp <= self.params["hib_start_tmp"]))
+
+        self._prepare()
+        self._advance()
+        return self._emit()
+
+    def close(self) -> dict:
+        """
+        Ends the recording, analyzes the remaining samples and returns
+        the results in the same form as analyze().
+
+        Returns:
+            dict: The dictionary storing the analysis results.
+        """
+        self._closed = True
+        interval = _get_interval(self._time.view)
+        # For Non-Hibernation
+        if self._valid and not self._cold:
+            results = _structured() | {
+                "interval": interval,
+                "ID": self.params["id"],
+                "group": self.params["group"],
+                "status": "Unhibernation",
+            }
+            _append_event("prehib", results, 0, len(self._tmp))
+            results = _finalize(results, self._tmp.view, self._time.view)
+            results = _modify_events(results, self.params)
+            return results | event_dict(results)
+
+        if self._state is None:
+            raise ValueError("Not found start time.")
+        if not self._hib_end_found:
+            self._set_hib_end_index(len(self.data["time"]) - 1)
+        if self._error:
+            raise ValueError(self._error)
+        self._advance()
+
+        data = self.data
+        results = _finalize(
+            self._results,
+            data["tmp"],
+            data["time"],
+            self._state["excluded"],
+            self._state["dropped"],
+        )
+        results = _modify_events(results, self.params)
+        return results | event_dict(results)
+
+    def _prepare(self) -> None:
+        """
+        Starts the analysis once the interval and the pre-hibernation start time
+        are known, and extends the lookup tables with the received samples.
+        """
+        time = self._time.view
+        if (
+            self._state is not None
+            and self._interval() != self._results["interval"]["seconds"]
+        ):
+            self._restart()
+        if self._state is None:
+            if len(time) < 2:
+                return None
+            try:
+                self._start_index = _get_start_index(
+                    time.view(np.int64), self.params["prehib_start_time"], True
+                )
+            except ValueError:
+                return None
+            self.params["prehib_start_time"] = time[self._start_index]
+            self._results["interval"] = _get_interval(time)
+            self.params = _modify_discrimination_to_interval(
+                self._results["interval"]["minutes"], self.params
+            )
+            self._horizon = max(
+                1,
+                self.params["hib_start_discrimination"],
+                self.params["dead_discrimination"],
+                self.params["hib_end_discrimination"],
+            )
+            lookup = {name: _StreamIndex() for name in _lookup_masks(
+                np.zeros(0), self.params
+            )}
+            self._state = _state(
+                self._results, None, None, self.params, lookup, None, None, None
+            )
+
+        data = self.data
+        seconds = data["time"].view(np.int64)
+        tmp = data["tmp"][self._lookup_length:]
+        for name, mask in _lookup_masks(tmp, self.params, self._streak).items():
+            self._state["lookup"][name].extend(mask)
+        excluded, exclusion_end, self._exclusion_active = _exclusion_mask(
+            seconds[self._lookup_length:], self.params, self._exclusion_active
+        )
+        self._exclusion.extend(excluded)
+        self._exclusion_end.extend(exclusion_end)
+        self._hib_end.extend(np.zeros(len(tmp), dtype=bool))
+        self._lookup_length += len(tmp)
+        in_band = (self.params["lower_threshold"] <= tmp) & (
+            tmp < self.params["upper_threshold"]
+        )
+        out_of_band = np.flatnonzero(~in_band)
+        self._streak = (
+            self._streak + len(tmp)
+            if len(out_of_band) == 0
+            else len(tmp) - out_of_band[-1] - 1
+        )
+
+        if not self._hib_end_found:
+            hib_end_time = _epoch_seconds(self.params["hib_end_time"])
+            found = np.searchsorted(seconds, hib_end_time, "right")
+            if found < len(seconds):
+                self._set_hib_end_index(found - 1)
+
+    def _interval(self) -> int:
+        """
+        Returns the most frequent interval of the received samples in seconds,
+        the shortest one of a tie as in check_time.
+
+        Returns:
+            int: The interval in seconds.
+        """
+        most = max(self._intervals.values())
+        return min(
+            interval for interval, count in self._intervals.items() if count == most
+        )
+
+    def _set_hib_end_index(self, index: int) -> None:
+        """
+        Marks the last sample at or before the hibernation end time,
+        as _get_end_index does.
+
+        Args:
+            index (int): The index of the last sample at or before
+            the hibernation end time.
+        """
+        self._hib_end_found = True
+        if index < 2:
+            self._error = "Not found end time."
+        else:
+            self._hib_end.view[index] = True
+
+    def _ready(self, i: int) -> bool:
+        """
+        Checks whether the sample can be analyzed with the received samples.
+
+        Args:
+            i (int): The index of the sample.
+        Returns:
+            bool: True if the sample can be analyzed, False otherwise.
+        """
+        if self._closed:
+            return True
+        results, params = self._results, self.params
+        tmp = self._state["tmp"]
+        if len(tmp) <= i + self._horizon:
+            return False
+        # The post-hibernation period depends on the length of the recording
+        if (
+            results["hib_end_idx"] is not None
+            and len(tmp) < results["interval"]["minutes"] * 24 * 7
+        ):
+            return False
+        # The datalogger removal depends on the rest of the recording
+        if (
+            results["hib_start_idx"] is not None
+            and results["hib_end_idx"] is None
+            and i > 0
+            and params["lower_threshold"] <= tmp[i] < params["upper_threshold"]
+            and not params["lower_threshold"] <= tmp[i - 1] < params["upper_threshold"]
+        ):
+            return self._state["lookup"]["next_out_of_band"][i + 1] < len(tmp)
+        return True
+
+    def _advance(self) -> None:
+        """
+        Analyzes the received samples in order until a sample cannot be decided.
+        """
+        if self._state is None or self._finished or self._error:
+            return None
+        data = self.data
+        self._state["tmp"], self._state["time"] = data["tmp"], data["time"]
+        self._state["exclusion"] = self._exclusion.view
+        self._state["exclusion_end"] = self._exclusion_end.view
+        self._state["hib_end"] = self._hib_end.view
+        while self._next_sample < len(data["tmp"]) and self._ready(self._next_sample):
+            self._next_sample += 1
+            if not _step(self._state, self._next_sample - 1):
+                self._finished = True
+                break
+
+    def _emit(self) -> np.ndarray:
+        """
+        Picks up the events appended since the last emission.
+
+        Returns:
+            numpy.ndarray: The event table of the new events, numbered through
+            the whole recording.
+        """
+        events = _event_table(self._results["events"][self._emitted:])
+        self._emitted = len(self._results["events"])
+        if len(events):
+            # the events leave out the skipped and dropped samples
+            # as in analyze()
+            results = {
+                "data": self.data | {
+                    "excluded": np.array(self._state["excluded"], dtype=np.int64),
+                    "dropped": np.array(self._state["dropped"], dtype=np.int64),
+                },
+                "hib_end_idx": self._results["hib_end_idx"],
+            }
+            start, end = events["start_idx"].min(), events["end_idx"].max()
+            events = _trim_events(
+                events,
+                _missing_samples(results, start, end),
+                results["data"]["dropped"],
+            )
+        events["event_number"] += self._counts[events["event_code"]]
+        np.add.at(self._counts, events["event_code"], 1)
+        return events
@@ -1,17 +1,52 @@
 import csv
+import hashlib
+import io
 import numpy as np
 import os
 import pandas as pd
 import re
 import shutil
 import traceback
-from typing import Union
+from typing import BinaryIO, Tuple, Union
 import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
 import glob
 import plotly.graph_objects as go
+from pandas.tseries.api import guess_datetime_format
 
+from analysis import categorizer, loggers, store, timing
 from setting import DATA_DIR_PATH, PARAMS_DIR_PATH, FIGS_DIR_PATH, ARTIFACTS_DIR_PATH, TRASH_DIR_PATH
+from setting import (
+    DATASET_CACHE_DIR_PATH, DATA_FORMAT_MAX_WORKERS, DEFAULT_MAX_WORKERS,
+    RESULT_CACHE_DIR_PATH,
+)
+
+# The separator of several date/time strings in a parameter cell
+EXCLUSION_SEPARATOR = ";"
+# The date/time columns of the parameter file
+PARAM_TIME_COLUMNS = ["prehib_start_time", "hib_end_time"]
+PARAM_TIMES_COLUMNS = ["exclusion_start_time", "exclusion_end_time"]
+# The formats of the date/time parameters parsed at once (see normalize_datetimes)
+PARAM_DATETIME_FORMATS = ["%Y/%m/%d %H:%M", "%Y-%m-%d %H:%M"]
+# The number of parameter files whose parsed tables are kept in memory
+PARAMS_CACHE_SIZE = 16
+
+# The parsed parameter tables keyed by the content hash, least recently used first
+_params_tables = OrderedDict()
+
+# The number of bytes searched for the header row
+HEADER_SNIFF_BYTES = 8192
+# The number of rows from which the date/time format of a file is detected
+DATETIME_SAMPLE_ROWS = 100
+# The date/time formats tried when pandas cannot guess one (e.g., 12-hour clock)
+DATETIME_FORMATS = [
+    "%Y/%m/%d %I:%M:%S %p",
+    "%Y/%m/%d %I:%M %p",
+    "%Y-%m-%d %I:%M:%S %p",
+    "%Y-%m-%d %I:%M %p",
+]
 
 def mkdirs():
     """
@@ -73,29 +108,26 @@ def get_min_attr(data: dict) -> dict:
     return attrs
 
 
-def get_header_info(file_name: str) -> Union[int, str]:
+def get_header_info(f: BinaryIO) -> Tuple[int, str]:
     """
-    Opens the specified CSV file and reads it line by line to determine
-    the header index and the type of data logger used (iBottun, nanotag and arco).
+    Reads the beginning of the CSV file, at most HEADER_SNIFF_BYTES bytes,
+    to determine the position of the header row and the type of data logger used
+    (iBottun, nanotag, arco and the other formats registered in loggers).
 
     Args:
-        file_name (str): The name of the CSV file to be analyzed (including the path
-                         if the file is not in the current directory).
+        f (BinaryIO): The CSV file opened in binary mode.
     Returns:
-        Union[int, str]: The header index or the type of data logger used.
+        Tuple[int, str]: The byte offset of the header row and the type of
+        data logger used.
+    Raises:
+        ValueError: If the header row of a known data logger is not found.
     """
-    logger_pattern = {
-        "Date/Time,Unit,Value": "iBottun",
-        "日時,振動数(積分値),SE,温度(平均値),SE,,": "nanotag",
-        # "": "arco",
-    }
-    with open(file_name) as f:
-        newline_count = 0
-        for i, line in enumerate(f.readlines()):
-            if line == "\n":
-                newline_count += 1
-            elif (logger_type := logger_pattern.get(line.strip())) is not None:
-                return i - newline_count, logger_type
+    if (header_info := loggers.detect(f.read(HEADER_SNIFF_BYTES))) is None:
+        raise ValueError(
+            "Not found the header of a known data logger "
+            f"in the first {HEADER_SNIFF_BYTES} bytes."
+        )
+    return header_info
 
 
 def adjust_year(dt: str) -> str:
@@ -115,95 +147,286 @@ def adjust_year(dt: str) -> str:
     return dt
 
 
-def data_format(files: list) -> tuple:
+def parse_datetime(values: pd.Series) -> pd.Series:
+    """
+    Parses the date/time strings of a data file. The two-digit year pattern
+    (see adjust_year) and the format are detected once from the first
+    DATETIME_SAMPLE_ROWS rows, and the whole column is parsed with pandas
+    string operations and the detected format. Only the rows failing to be
+    parsed are adjusted one by one.
+
+    Args:
+        values (pandas.Series): The date/time strings.
+    Returns:
+        pandas.Series: The date/time data in the datetime64[s] format.
+    """
+    sample = values.iloc[:DATETIME_SAMPLE_ROWS].astype(str)
+    adjusted = sample.map(adjust_year)
+    if len(sample) and (adjusted != sample).all():
+        prefixed = "20" + values.astype(str)
+    else:
+        prefixed = values
+    fmt = _detect_datetime_format(adjusted)
+    if fmt is None:
+        parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[s]")
+    else:
+        parsed = pd.to_datetime(prefixed, format=fmt, errors="coerce")
+
+    failed = parsed.isna().to_numpy()
+    if failed.any():
+        parsed = parsed.astype("datetime64[s]")
+        parsed[failed] = values[failed].apply(adjust_year).astype("datetime64[s]")
+    return parsed.astype("datetime64[s]")
+
+
+def _detect_datetime_format(sample: pd.Series) -> str:
+    """
+    Detects the format parsing every date/time string of the sample.
+
+    Args:
+        sample (pandas.Series): The date/time strings with four-digit years.
+    Returns:
+        str: The format, or None if no format parses the sample.
+    """
+    if sample.empty:
+        return None
+    for fmt in [guess_datetime_format(sample.iloc[0])] + DATETIME_FORMATS:
+        if fmt is None:
+            continue
+        if pd.to_datetime(sample, format=fmt, errors="coerce").notna().all():
+            return fmt
+    return None
+
+
+def data_format(files: list, max_workers: int = None, use_store: bool = True) -> tuple:
     """
     Reads CSV files, formats data into a DataFrame, and performs basic data cleaning.
+    The files are parsed in parallel with a process pool.
 
     Args:
         files (list): A list of CSV file names to be analyzed (including the path
                       if the file is not in the current directory
+        max_workers (int): The number of worker processes.
+                           If None, DATA_FORMAT_MAX_WORKERS is used.
+        use_store (bool): Whether the data is loaded from and saved in
+                          the store.
     Returns:
         dict: A dictionary where the keys are the file names and the values are
-              the corresponding DataFrames after formatting and cleaning.
+              the corresponding DataFrames after formatting and cleaning,
+              in the order of the files, and the error messages of the failed files.
     Note:
         The row included NaN is deleted, if the data has NaN.
         And the index of start set 0.
+        The parsed data is cached by the content of the file (see store),
+        so that the files parsed for the visualization are not parsed again.
     """
-    replace_patterns = {
-        'nanotag': {"日時": "Date/Time", "温度(平均値)": "Value"}
-    }
+    timed = timing.is_enabled()
+    formatted, errors = {}, {}
+    max_workers = (
+        max_workers
+        or DATA_FORMAT_MAX_WORKERS
+        or min(os.cpu_count() or 1, DEFAULT_MAX_WORKERS)
+    )
+    max_workers = min(max_workers, len(files))
+    if max_workers <= 1:
+        for file in files:
+            try:
+                formatted[file] = _format_worker(file, timed, use_store)
+            except Exception as e:
+                _format_error(file, e, errors)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                file: executor.submit(_format_worker, file, timed, use_store)
+                for file in files
+            }
+            for file, future in futures.items():
+                try:
+                    formatted[file] = future.result()
+                except Exception as e:
+                    _format_error(file, e, errors)
+    return _load_formatted(files, formatted, errors), errors
+
 
+def _load_formatted(files: list, formatted: dict, errors: dict) -> dict:
+    """
+    Collects the data parsed by the workers in the order of the files.
+    The data saved in the store is memory-mapped in this process, and the data
+    evicted from the store in the meantime is parsed again.
+
+    Args:
+        files (list): The names of the CSV files.
+        formatted (dict): The results of _format_worker keyed by file name.
+        errors (dict): The error messages of the failed files.
+    Returns:
+        dict: The DataFrames of the data keyed by file name.
+    """
     data = {}
-    errors = {}
     for file in files:
-        file_path = os.path.join(DATA_DIR_PATH, file)
-        header_index, file_type = get_header_info(file_path)
+        if file not in formatted:
+            continue
+        key, df, records = formatted[file]
+        timing.extend(records)
         try:
-            if file_type == 'nanotag':
-                df = pd.read_csv(file_path, header=header_index, encoding="Shift-JIS")
-                df.rename(columns=replace_patterns[file_type], inplace=True)
-                df = df[["Date/Time", "Value"]]
-            else:
-                df = pd.read_csv(file_path, header=header_index, encoding="Shift-JIS")
-            if df.isnull().values.sum() != 0:
-                print("DataError: Founded NaN data")
-                df = df.dropna()
-                print(f"Removed Nan values. Remaining rows: {len(df)}")
-            df["Date/Time"] = df["Date/Time"].apply(adjust_year).astype("datetime64[s]")
-            
-            if 'Value' in df.columns:
-                # string > num
-                df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
-                # delete
-                if df['Value'].isnull().sum() > 0:
-                    print(f"Warnig: {df['Value'].isnull().sum()} non-numeric values in Value column and will be removed")
-                    df = df.dropna(subset=['Value'])
-            # reset index
-            df = df.reset_index(drop=True)
-
-            data[file] = df
-        except pd.errors.ParserError as e:
-            print(traceback.format_exc())
-            print(f"data_format parse error in {file}: {str(e)}")
-            errors[file] = str(e)
+            if df is None:
+                df = store.load(key)
+            if df is None:
+                df = read_data_file(os.path.join(DATA_DIR_PATH, file))
         except Exception as e:
-            print(traceback.format_exc())
-            print(f"Other case error in {file}: {str(e)}")
-            errors[file] = str(e)
-    return data, errors
+            _format_error(file, e, errors)
+            continue
+        data[file] = df
+    return data
 
 
-def data_format_for_arco(file):
+def _format_worker(file: str, timed: bool = False, use_store: bool = True) -> tuple:
     """
-    Processes data specifically for the ARCO data logger format, cleaning 
-    and converting it into a DataFrame.
+    Parses a data file in a worker process. The data saved in the store is not
+    sent back, since the caller loads it from the store.
 
-    Note:
-        Next action, add arco type.
+    Args:
+        file (str): The name of the CSV file.
+        timed (bool): Whether the stages are timed.
+        use_store (bool): Whether the data is loaded from and saved in the store.
+    Returns:
+        tuple: The key of the file in the store (None if the store is not used),
+        the DataFrame of the data or None if it is in the store, and the records
+        of the timed stages.
     """
-    dir_path = os.path.join(os.getcwd(), DATA_DIR_PATH)
-    with open(
-        os.path.join(dir_path, f"alco_{file.filename}.csv"), "w", newline="\n"
-    ) as csvfile:
-        w = csv.writer(csvfile)
-        f = open(file)
-        for line in f.readlines():
-            if line.count(",") == 1:
-                continue
-            elif line.count(",") == 34:
-                w.writerow(
-                    line.replace('"', "").replace("\n", "").replace("#", "").split(",")
-                )
-            elif line == "*****MarkComment*****":
-                continue
+    with timing.collecting(timed) as records:
+        with timing.stage("data_format", file=file):
+            file_path = os.path.join(DATA_DIR_PATH, file)
+            key, df, stored = None, None, False
+            if use_store:
+                key = store.file_key(file_path)
+                df = store.load(key)
+            if df is not None:
+                timing.count("cached", 1)
+                stored = True
             else:
-                raise "new ARCO data pattern: {}".format(line)
-    print(f"Successfully!! 'arco_{file.filename}.csv' was created.")
-    return pd.read_csv(
-        os.path.join(dir_path, f"arco_{file.filename}.csv"), header=0, skiprows=[1]
+                df = read_data_file(file_path)
+                stored = use_store and store.save(key, df)
+            timing.count("rows", len(df))
+    return key, None if stored else df, records
+
+
+def _format_error(file: str, e: Exception, errors: dict) -> None:
+    """
+    Reports the error of a data file.
+
+    Args:
+        file (str): The name of the CSV file.
+        e (Exception): The error.
+        errors (dict): The error messages of the failed files.
+    """
+    print(traceback.format_exc())
+    if isinstance(e, pd.errors.ParserError):
+        print(f"data_format parse error in {file}: {str(e)}")
+    else:
+        print(f"Other case error in {file}: {str(e)}")
+    errors[file] = str(e)
+
+
+def read_data_file(file_path: str) -> pd.DataFrame:
+    """
+    Parses a CSV file of a data logger in chunks of loggers.CSV_CHUNK_ROWS rows
+    with the reader of its format. Each chunk is cleaned and converted,
+    and appended to the growable typed
+    arrays, so that the memory used by the parsing does not grow with the size
+    of the file beyond the arrays themselves.
+
+    Args:
+        file_path (str): The path of the CSV file.
+    Returns:
+        pandas.DataFrame: The date/time (datetime64[s]) and temperature (float64)
+        data.
+    """
+    # The size of a row is at least about 24 bytes in the known formats
+    capacity = max(os.path.getsize(file_path) // 24, 1)
+    buffer = {
+        "time": np.empty(capacity, dtype=np.int64),
+        "tb": np.empty(capacity, dtype=np.float64),
+        "size": 0,
+    }
+    nan_rows, non_numeric = 0, 0
+    # The data is parsed once from the header row found at the beginning
+    with open(file_path, "rb") as f:
+        header_offset, file_type = get_header_info(f)
+        f.seek(header_offset)
+        for chunk in loggers.LOGGER_FORMATS[file_type]["read"](f):
+            time, tb, nan_count, non_numeric_count = _clean_chunk(chunk)
+            _append_rows(buffer, time, tb)
+            nan_rows += nan_count
+            non_numeric += non_numeric_count
+            timing.count("chunks", 1)
+
+    if nan_rows > 0:
+        print("DataError: Founded NaN data")
+        print(f"Removed Nan values. Remaining rows: {buffer['size'] + non_numeric}")
+    if non_numeric > 0:
+        print(
+            f"Warnig: {non_numeric} non-numeric values in Value column "
+            "and will be removed"
+        )
+    return pd.DataFrame(
+        {
+            "Date/Time": buffer["time"][:buffer["size"]].view("datetime64[s]"),
+            "Value": buffer["tb"][:buffer["size"]],
+        },
+        copy=False,
+    )
+
+
+def _clean_chunk(chunk: pd.DataFrame) -> tuple:
+    """
+    Removes the rows with NaN or non-numeric temperatures from a chunk of a CSV file
+    and converts its columns.
+
+    Args:
+        chunk (pandas.DataFrame): The rows of the CSV file.
+    Returns:
+        tuple: The epoch seconds, the temperatures, the number of rows with NaN and
+        the number of rows with non-numeric temperatures.
+    """
+    rows = len(chunk)
+    chunk = chunk.dropna()
+    nan_rows = rows - len(chunk)
+
+    time = parse_datetime(chunk["Date/Time"])
+    # string > num
+    value = pd.to_numeric(chunk["Value"], errors="coerce")
+    numeric = value.notna().to_numpy()
+    return (
+        time.to_numpy(dtype="datetime64[s]")[numeric].view(np.int64),
+        value.to_numpy(dtype=np.float64)[numeric],
+        nan_rows,
+        int((~numeric).sum()),
     )
 
 
+def _append_rows(buffer: dict, time: np.ndarray, tb: np.ndarray) -> None:
+    """
+    Appends rows to the growable typed arrays, doubling their capacity when full.
+
+    Args:
+        buffer (dict): The arrays of the epoch seconds and the temperatures,
+        and the number of the filled rows.
+        time (numpy.ndarray): The epoch seconds of the rows.
+        tb (numpy.ndarray): The temperatures of the rows.
+    """
+    start = buffer["size"]
+    end = start + len(tb)
+    if end > len(buffer["tb"]):
+        capacity = max(end, 2 * len(buffer["tb"]))
+        for name in ["time", "tb"]:
+            grown = np.empty(capacity, dtype=buffer[name].dtype)
+            grown[:start] = buffer[name][:start]
+            buffer[name] = grown
+    buffer["time"][start:end] = time
+    buffer["tb"][start:end] = tb
+    buffer["size"] = end
+
+
 def convert_datetime(param_dt: str) -> str:
     """
     Convert datetime string to datetime.Timestamp type.
@@ -238,7 +461,7 @@ def convert_datetime(param_dt: str) -> str:
 
         # format time string
         if not re.search(r"^\d{2}:\d{2}$", time):
-            h_m = re.search(r"^(\d):(\d)", time)
+            h_m = re.search(r"^(\d{1,2}):(\d{1,2})", time)
             if h_m:
                 hour = h_m[1] if len(h_m[1]) == 2 else f"0{h_m[1]}"
                 minutes = h_m[2] if len(h_m[2]) == 2 else f"0{h_m[2]}"
@@ -252,6 +475,124 @@ def convert_datetime(param_dt: str) -> str:
         print(traceback.format_exc())
 
 
+def split_times(param_dts) -> list:
+    """
+    Splits a parameter cell holding several date/time strings separated by
+    EXCLUSION_SEPARATOR (e.g., the exclusion periods of an animal).
+
+    Args:
+        param_dts: The date/time strings or NaN.
+    Returns:
+        list: The date/time strings.
+    """
+    if not isinstance(param_dts, str):
+        return []
+    return [dt.strip() for dt in param_dts.split(EXCLUSION_SEPARATOR) if dt.strip()]
+
+
+def normalize_datetimes(param_dts: pd.Series) -> pd.Series:
+    """
+    Converts the date/time strings of a parameter column as convert_datetime does.
+    The strings in the common formats (PARAM_DATETIME_FORMATS) are parsed by
+    pandas at once, and only the other strings are converted one by one by
+    convert_datetime.
+
+    Args:
+        param_dts (pandas.Series): The date/time strings or NaN.
+    Returns:
+        pandas.Series: The converted date/time strings, NaN for the cells without
+        a string, or None if the string cannot be converted.
+    """
+    converted = np.full(len(param_dts), np.nan, dtype=object)
+    if param_dts.dtype != object:
+        return pd.Series(converted, index=param_dts.index, dtype=object)
+    values = param_dts.to_numpy()
+    positions = np.flatnonzero([isinstance(dt, str) for dt in values])
+    strings = pd.Series(values[positions], dtype=object)
+    parsed = pd.Series(pd.NaT, index=strings.index, dtype="datetime64[ns]")
+    # the space of a format matches any whitespace, which convert_datetime rejects
+    plain = strings.str.fullmatch(r"\S+ \S+").fillna(False).to_numpy(dtype=bool)
+    for fmt in PARAM_DATETIME_FORMATS:
+        missing = parsed.isna() & plain
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(strings[missing], format=fmt, errors="coerce")
+
+    matched = parsed.notna().to_numpy()
+    minutes = parsed[matched].to_numpy().astype("datetime64[m]")
+    converted[positions[matched]] = np.char.replace(
+        np.datetime_as_string(minutes, unit="m"), "T", " "
+    ).astype(object)
+    for position, dt in zip(positions[~matched], strings[~matched]):
+        converted[position] = convert_datetime(dt)
+    return pd.Series(converted, index=param_dts.index, dtype=object)
+
+
+def normalize_datetime_lists(param_dts: pd.Series) -> pd.Series:
+    """
+    Splits the parameter cells holding several date/time strings (see split_times)
+    and converts each of them with normalize_datetimes.
+
+    Args:
+        param_dts (pandas.Series): The date/time strings or NaN.
+    Returns:
+        pandas.Series: The list of the converted date/time strings of each cell.
+    """
+    if param_dts.dtype != object:
+        return pd.Series([[] for _ in param_dts], index=param_dts.index, dtype=object)
+    if param_dts.empty:
+        return pd.Series([], index=param_dts.index, dtype=object)
+    cells = param_dts.str.split(EXCLUSION_SEPARATOR)
+    # a cell without a string is exploded into one NaN
+    rows = np.repeat(
+        np.arange(len(cells)), cells.str.len().fillna(1).clip(lower=1).astype(int)
+    )
+    dts = cells.explode().str.strip()
+    kept = (dts.str.len() > 0).to_numpy()
+    converted = normalize_datetimes(dts[kept]).to_numpy()
+    counts = np.bincount(rows[kept], minlength=len(cells))
+    return pd.Series(
+        [list(dts) for dts in np.split(converted, np.cumsum(counts)[:-1])],
+        index=param_dts.index,
+        dtype=object,
+    )
+
+
+def read_params_table(file_path: str) -> tuple:
+    """
+    Reads a parameter file and converts its date/time columns. The parsed tables
+    are cached by the content of the file, so that the file previewed and
+    validated is not parsed again for the analysis.
+
+    Args:
+        file_path (str): The path of the parameter file.
+    Returns:
+        tuple: The table of the parameter file as it is read, and the table of
+        the converted date/time columns (the lists of the converted date/time
+        strings for the exclusion periods). Both are copies which the caller
+        may modify.
+    """
+    with open(file_path, "rb") as f:
+        content = f.read()
+    key = hashlib.blake2b(content, digest_size=20).hexdigest()
+    if key in _params_tables:
+        _params_tables.move_to_end(key)
+    else:
+        table = pd.read_csv(io.BytesIO(content), header=0)
+        times = pd.DataFrame(index=table.index)
+        for col in PARAM_TIME_COLUMNS:
+            if col in table:
+                times[col] = normalize_datetimes(table[col])
+        for col in PARAM_TIMES_COLUMNS:
+            if col in table:
+                times[col] = normalize_datetime_lists(table[col])
+        _params_tables[key] = (table, times)
+        while len(_params_tables) > PARAMS_CACHE_SIZE:
+            _params_tables.popitem(last=False)
+    table, times = _params_tables[key]
+    return table.copy(), times.copy()
+
+
 def create_unique_dir(unique_name: str) -> Union[str, str]:
     """
     Creates a unique directory for storing analysis results.
@@ -293,8 +634,8 @@ def create_specific_dir(dir_path: str, file_name: str) -> str:
 
 def save_artifacts(folder_path: str, file: str, results: dict) -> None:
     """
-    Saves the analysis results to two CSV files: one for the processed data
-    and one for the analysis summary.
+    Saves the analysis results to three CSV files: one for the processed data,
+    one for the analysis summary and one for the statistics of each event.
 
     Args:
         folder_path (str): The path to the directory where the CSV file will be saved.
@@ -386,6 +727,12 @@ def save_artifacts(folder_path: str, file: str, results: dict) -> None:
                                 
     print(f"Successfully. 'hib_analysis_{id_name}.csv' was created.")
 
+    # for event statistics
+    categorizer.event_statistics(results).to_csv(
+        os.path.join(dir_path, f"hib_event_statistics_{id_name}.csv"), index=False
+    )
+    print(f"Successfully. 'hib_event_statistics_{id_name}.csv' was created.")
+
     # for process_data
     with open(
         os.path.join(dir_path, f"hib_process_data_{id_name}.csv"), "w", newline="\n"
@@ -452,16 +799,18 @@ def output(results: dict) -> dict:
     return display_set
 
 
-def pick_up_parameter(files: list, params: list) -> dict:
+def pick_up_parameter(files: list, params: list, exclusions: list = None) -> dict:
     """
     Constructs a dictionary of parameters for each file in the input list.
 
     Args:
         files (list): A list of file names.
         params (list): A list of parameter values corresponding to the inputed patrameters.
+        exclusions (list): The (start, end) times of the additional exclusion periods.
     Returns:
         dict: A dictionary where keys are file names and values are dictionaries of parameters.
     """
+    exclusion_periods = [(params[4], params[5])] + list(exclusions or [])
     param_set = {
         "ID": params[0],
         "group": params[1],
@@ -476,8 +825,12 @@ def pick_up_parameter(files: list, params: list) -> dict:
         "dead_discrimination": params[12],
         "refractoryness_discrimination": params[13],
         "pa_discrimination": params[14],
-        "exclusion_start_time": np.nan if params[4] == '' else params[4],
-        "exclusion_end_time": np.nan if params[5] == '' else params[5]
+        "exclusion_start_time": [
+            np.nan if start == '' else start for start, _ in exclusion_periods
+        ],
+        "exclusion_end_time": [
+            np.nan if end == '' else end for _, end in exclusion_periods
+        ],
     }
     parameters_dict = {}
     for file in files:
@@ -494,7 +847,7 @@ def read_parameters() -> dict:
     """
     dir_path = os.path.join(os.getcwd(), PARAMS_DIR_PATH)
     csvfile = os.listdir(dir_path)[0]
-    df = pd.read_csv(os.path.join(dir_path, csvfile), header=0, na_values=np.nan)
+    df, times = read_params_table(os.path.join(dir_path, csvfile))
     df.dropna(subset=["file_name"], inplace=True)
 
     # check NaN in essential parameters
@@ -515,19 +868,18 @@ def read_parameters() -> dict:
             print(f"NaN contains in {col} column.")
 
     # check the duplicated parameters
-    check_vals = df.to_dict()
-    if len(set(check_vals["file_name"].values())) != len(
-        check_vals["file_name"].values()
-    ):
+    if df["file_name"].duplicated().any():
         raise ValueError("file_name is deplicated.")
-    elif len(set(check_vals["ID"].values())) != len(check_vals["ID"].values()):
+    elif df["ID"].duplicated().any():
         raise ValueError("ID is deplicated.")
 
-    df["file_name"] = df["file_name"].apply(lambda nm: f"{nm.replace('.csv', '')}.csv")
-    df["prehib_start_time"] = df["prehib_start_time"].apply(convert_datetime)
-    df["hib_end_time"] = df["hib_end_time"].apply(convert_datetime)
-    df["exclusion_start_time"] = df["exclusion_start_time"].apply(convert_datetime)
-    df["exclusion_end_time"] = df["exclusion_end_time"].apply(convert_datetime)
+    df["file_name"] = df["file_name"].str.replace(".csv", "", regex=False) + ".csv"
+    for col in PARAM_TIME_COLUMNS + PARAM_TIMES_COLUMNS:
+        df[col] = times.loc[df.index, col]
+    if (
+        df["exclusion_start_time"].str.len() != df["exclusion_end_time"].str.len()
+    ).any():
+        raise ValueError("The numbers of exclusion start and end times do not match.")
 
     df = df.set_index("file_name")
     return df.to_dict("index")
@@ -589,14 +941,17 @@ def save_figures(data_list: list) -> None:
             height=500,
             margin=dict(l=80, r=50, t=50, b=80)
         )
-        fig.write_image(
-            os.path.join(FIGS_DIR_PATH, f"{file_name.replace('.csv', '.svg')}"),
-            width=800, height=500
-        )
-        fig.write_image(
-            os.path.join(FIGS_DIR_PATH, f"{file_name.replace('.csv', '_full.svg')}"),
-            width=800, height=500
-        )
+        with timing.stage("svg_export", file=file_name):
+            fig.write_image(
+                os.path.join(FIGS_DIR_PATH, f"{file_name.replace('.csv', '.svg')}"),
+                width=800, height=500
+            )
+            fig.write_image(
+                os.path.join(
+                    FIGS_DIR_PATH, f"{file_name.replace('.csv', '_full.svg')}"
+                ),
+                width=800, height=500
+            )
 
 def fig_list(files: list) -> dict:
     """
@@ -614,12 +969,54 @@ def fig_list(files: list) -> dict:
     return fig
 
 
-def validate_values(param_df: pd.DataFrame, headers: set, attr: dict) -> None:
+def _exclusion_errors(param_df: pd.DataFrame, times: pd.DataFrame = None) -> list:
+    """
+    Checks the pairs of the exclusion start and end times of each file.
+
+    Args:
+        param_df (pandas.DataFrame): The parameter table.
+        times (pandas.DataFrame): The converted date/time columns
+        (see read_params_table). If None, they are converted from param_df.
+    Returns:
+        list: The error messages.
+    """
+    if times is None:
+        times = pd.DataFrame({
+            col: normalize_datetime_lists(param_df[col]) for col in PARAM_TIMES_COLUMNS
+        })
+    starts, ends = times["exclusion_start_time"], times["exclusion_end_time"]
+    mismatched = starts.str.len() != ends.str.len()
+    paired = starts.index[~mismatched]
+    reversed_periods = (
+        pd.to_datetime(starts[paired].explode())
+        > pd.to_datetime(ends[paired].explode())
+    ).groupby(level=0).any()
+    errors = []
+    for index, file_name in param_df["file_name"].items():
+        if mismatched[index]:
+            errors.append(
+                "The numbers of exclusion start and end times do not match "
+                f"in {file_name}."
+            )
+        elif reversed_periods.get(index, False):
+            errors.append(
+                f"An exclusion start time is after its end time in {file_name}."
+            )
+    return errors
+
+
+def validate_values(
+        param_df: pd.DataFrame,
+        headers: set,
+        attr: dict,
+        times: pd.DataFrame = None) -> None:
     """
     Pick up essential parameters from the uploaded CSV file.
 
     Args:
         param (list): A list of essential parameters from the CSV file.
+        times (pandas.DataFrame): The converted date/time columns
+        (see read_params_table). If None, they are converted from param_df.
     Raises:
         ValueError: If essential parameters are empty.
     """
@@ -636,10 +1033,10 @@ def validate_values(param_df: pd.DataFrame, headers: set, attr: dict) -> None:
         raise ValueError(f"The {",".join(required_errors)} field has one or more empty entries, but it is mandatory.")
     
     # check validate
-    param_df["file_name"] = param_df["file_name"].apply(
-        lambda nm: f"{nm.replace('.csv', '')}.csv"
+    param_df["file_name"] = (
+        param_df["file_name"].str.replace(".csv", "", regex=False) + ".csv"
     )
-    validation_errors = []
+    validation_errors = _exclusion_errors(param_df, times)
     for name, min in attr.items():
         check_df = param_df[param_df["file_name"] == name]
         if check_df.empty:
@@ -697,13 +1094,11 @@ def preview_params(file_name: str, attrs: dict) -> tuple:
         'exclusion_end_time'
     }
     try:
-        tb = pd.read_csv(
-            os.path.join(PARAMS_DIR_PATH, file_name), header=0
-        )
+        tb, times = read_params_table(os.path.join(PARAMS_DIR_PATH, file_name))
         # check format
         if set(tb.columns) != headers:
             raise ValueError("The format of parameters is wrong.")
-        validate_values(tb, headers, attrs)
+        validate_values(tb, headers, attrs, times)
         return tb.columns.tolist(), tb.values.tolist()
     except ValueError as e:
         print(e)
@@ -843,31 +1238,34 @@ def plot_coloring_events_with_scale(
     else:  # "auto"
         file_suffix = "_auto"
 
-    fig.write_image(
-        os.path.join(dir_path, f"{file_name.replace('.csv', '')}{file_suffix}.svg"),
-        format="svg",
-        width=800, height=500,
-    )
-    fig.write_html(
-        os.path.join(dir_path, f"{file_name.replace('.csv', '')}{file_suffix}.html"),
-        full_html=False,
-        include_plotlyjs="cdn",
-        config={
-            'responsive': True,
-            'displayModeBar': True,
-            'modeBarButtonsToRemove': [],
-            'displaylogo': False
-        }
-    )
-    fig_responsive = go.Figure(fig.data, fig.layout)
-    fig_responsive.update_layout(
-        autosize=True,
-        width=None,
-        height=None
-    )
+    with timing.stage("svg_export", file=file_name):
+        fig.write_image(
+            os.path.join(dir_path, f"{file_name.replace('.csv', '')}{file_suffix}.svg"),
+            format="svg",
+            width=800, height=500,
+        )
+    with timing.stage("html", file=file_name):
+        fig.write_html(
+            os.path.join(
+                dir_path, f"{file_name.replace('.csv', '')}{file_suffix}.html"
+            ),
+            full_html=False,
+            include_plotlyjs="cdn",
+            config={
+                'responsive': True,
+                'displayModeBar': True,
+                'modeBarButtonsToRemove': [],
+                'displaylogo': False
+            }
+        )
+        fig_responsive = go.Figure(fig.data, fig.layout)
+        fig_responsive.update_layout(
+            autosize=True,
+            width=None,
+            height=None
+        )
     
-    return {
-        file_name: fig_responsive.to_html(
+        html = fig_responsive.to_html(
             full_html=False,
             include_plotlyjs="cdn",
             config={
@@ -875,19 +1273,23 @@ def plot_coloring_events_with_scale(
                 'displayModeBar': True
             }
         )
-    }
+    return {file_name: html}
 
 def calculate_optimal_y_range(data_dict: dict, buffer_percent: float = 0.1) -> tuple:
     """auto scale"""
-    all_temps = []
+    mins, maxs = [], []
     for df in data_dict.values():
-        all_temps.extend(df['Value'].dropna().tolist())
+        values = np.asarray(df['Value'])
+        values = values[~np.isnan(values)]
+        if len(values) > 0:
+            mins.append(float(values.min()))
+            maxs.append(float(values.max()))
     
-    if not all_temps:
+    if not mins:
         return 0, 40
     
-    min_temp = min(all_temps)
-    max_temp = max(all_temps)
+    min_temp = min(mins)
+    max_temp = max(maxs)
     temp_range = max_temp - min_temp
     buffer = temp_range * buffer_percent
     
@@ -953,10 +1355,13 @@ def save_figures_with_scale(data_list: dict, y_range: tuple = None, scale_mode:
             file_suffix = "_unified"
         else:  # "auto"
             file_suffix = "_auto"
-        fig.write_image(
-            os.path.join(FIGS_DIR_PATH, f"{file_name.replace('.csv', '')}{file_suffix}.svg"),
-            width=800, height=500
-        )
+        with timing.stage("svg_export", file=file_name):
+            fig.write_image(
+                os.path.join(
+                    FIGS_DIR_PATH, f"{file_name.replace('.csv', '')}{file_suffix}.svg"
+                ),
+                width=800, height=500
+            )
 
 def cleanup_old_artifacts(keep_latest=3):
     """Move all but the most recent N items to the trash"""
@@ -969,6 +1374,12 @@ def cleanup_old_artifacts(keep_latest=3):
         folders = []
         for item in os.listdir(ARTIFACTS_DIR_PATH):
             item_path = os.path.join(ARTIFACTS_DIR_PATH, item)
+            # the caches are evicted by their own size limits
+            if os.path.abspath(item_path) in [
+                os.path.abspath(RESULT_CACHE_DIR_PATH),
+                os.path.abspath(DATASET_CACHE_DIR_PATH),
+            ]:
+                continue
             if os.path.isdir(item_path):
                 ctime = os.path.getctime(item_path)
                 folders.append((ctime, item, item_path))
@@ -0,0 +1,197 @@
+import io
+import re
+from typing import BinaryIO, Callable, Iterator
+
+import pandas as pd
+
+# The number of rows parsed at once from a data file
+CSV_CHUNK_ROWS = 100000
+
+# The number of fields of a row of the ARCO data
+ARCO_FIELDS = 35
+# The line separating the comments of the ARCO data
+ARCO_MARK_COMMENT = "*****MarkComment*****"
+
+# The handlers of the data logger formats, tried in the order of registration
+LOGGER_FORMATS = {}
+
+
+def register(name: str, detect: Callable, read: Callable) -> None:
+    """
+    Registers the handler of a data logger format.
+
+    Args:
+        name (str): The type of data logger.
+        detect (Callable): The function receiving the first bytes of a file
+        and returning the byte offset of its header row, or None if the file is
+        not of this format.
+        read (Callable): The function receiving the file opened in binary mode
+        at the header row and yielding the rows as DataFrames of
+        CSV_CHUNK_ROWS rows at most, with "Date/Time" and "Value" columns
+        (the rows with NaN in any column are removed as missing data).
+    """
+    LOGGER_FORMATS[name] = {"detect": detect, "read": read}
+
+
+def detect(block: bytes) -> tuple:
+    """
+    Determines the type of data logger from the first bytes of a file.
+
+    Args:
+        block (bytes): The first bytes of the file.
+    Returns:
+        tuple: The byte offset of the header row and the type of data logger,
+        or None if the format is unknown.
+    """
+    for name, handler in LOGGER_FORMATS.items():
+        if (offset := handler["detect"](block)) is not None:
+            return offset, name
+    return None
+
+
+def _lines(block: bytes) -> Iterator[tuple]:
+    """
+    Splits the first bytes of a file into lines decoded as Shift-JIS.
+
+    Args:
+        block (bytes): The first bytes of the file.
+    Yields:
+        tuple: The byte offset of the line and the stripped line.
+    """
+    offset = 0
+    for line in block.splitlines(keepends=True):
+        yield offset, line.decode("Shift-JIS", errors="replace").strip()
+        offset += len(line)
+
+
+def _header_detector(header: str) -> Callable:
+    """
+    Returns the detection of a format by its header row.
+
+    Args:
+        header (str): The header row.
+    Returns:
+        Callable: The function returning the byte offset of the header row.
+    """
+    def detect_header(block: bytes) -> int:
+        return next((offset for offset, line in _lines(block) if line == header), None)
+    return detect_header
+
+
+def _read_ibutton(f: BinaryIO) -> Iterator[pd.DataFrame]:
+    """
+    Reads the iButton data ("Date/Time,Unit,Value").
+
+    Args:
+        f (BinaryIO): The file opened in binary mode at the header row.
+    Yields:
+        pandas.DataFrame: The rows of the file.
+    """
+    yield from pd.read_csv(f, encoding="Shift-JIS", chunksize=CSV_CHUNK_ROWS)
+
+
+def _read_nanotag(f: BinaryIO) -> Iterator[pd.DataFrame]:
+    """
+    Reads the date/time and the mean temperature of the nanotag data.
+
+    Args:
+        f (BinaryIO): The file opened in binary mode at the header row.
+    Yields:
+        pandas.DataFrame: The rows of the file.
+    """
+    for chunk in pd.read_csv(f, encoding="Shift-JIS", chunksize=CSV_CHUNK_ROWS):
+        chunk = chunk.rename(columns={"日時": "Date/Time", "温度(平均値)": "Value"})
+        yield chunk[["Date/Time", "Value"]]
+
+
+def _detect_arco(block: bytes) -> int:
+    """
+    Detects the ARCO data by its first row of ARCO_FIELDS fields, the header row.
+
+    Args:
+        block (bytes): The first bytes of the file.
+    Returns:
+        int: The byte offset of the header row, or None if the file is not
+        the ARCO data.
+    """
+    return next(
+        (
+            offset for offset, line in _lines(block)
+            if line.count(",") == ARCO_FIELDS - 1
+        ),
+        None,
+    )
+
+
+def _arco_columns(header: list) -> tuple:
+    """
+    Finds the date/time and temperature columns of the ARCO data by their names.
+    The date and the time may be given in separate columns.
+
+    Args:
+        header (list): The names of the columns.
+    Returns:
+        tuple: The indices of the date/time columns and the index of
+        the temperature column.
+    Raises:
+        ValueError: If the columns are not found.
+    """
+    names = [name.strip().lower() for name in header]
+
+    def find(pattern: str) -> int:
+        found = [i for i, name in enumerate(names) if re.search(pattern, name)]
+        return found[0] if found else None
+
+    date, time, value = find("date|日付|日時"), find("time|時刻"), find("temp|温度")
+    if (date is None and time is None) or value is None:
+        raise ValueError(
+            "Not found the date/time and temperature columns of the ARCO data: "
+            f"{header}"
+        )
+    time_columns = [i for i in dict.fromkeys([date, time]) if i is not None]
+    return time_columns, value
+
+
+def _read_arco(f: BinaryIO) -> Iterator[pd.DataFrame]:
+    """
+    Reads the ARCO data line by line. The rows of ARCO_FIELDS fields are
+    the header row, the row of the units and the data, and the rows of
+    one field (e.g., the metadata) and the comment marks are skipped.
+
+    Args:
+        f (BinaryIO): The file opened in binary mode at the header row.
+    Yields:
+        pandas.DataFrame: The rows of the file.
+    Raises:
+        ValueError: If an unknown row is found.
+    """
+    time_columns, value_column = None, None
+    units_skipped, rows = False, []
+    for line in io.TextIOWrapper(f, encoding="Shift-JIS"):
+        line = line.rstrip("\r\n")
+        if line.count(",") == ARCO_FIELDS - 1:
+            fields = line.replace('"', "").replace("#", "").split(",")
+            if time_columns is None:
+                time_columns, value_column = _arco_columns(fields)
+            elif not units_skipped:
+                units_skipped = True
+            else:
+                # an empty field is missing data
+                rows.append([
+                    " ".join(fields[i].strip() for i in time_columns).strip() or None,
+                    fields[value_column].strip() or None,
+                ])
+                if len(rows) >= CSV_CHUNK_ROWS:
+                    yield pd.DataFrame(rows, columns=["Date/Time", "Value"])
+                    rows = []
+        elif line.count(",") == 1 or line.strip() in ["", ARCO_MARK_COMMENT]:
+            continue
+        else:
+            raise ValueError(f"new ARCO data pattern: {line}")
+    if rows:
+        yield pd.DataFrame(rows, columns=["Date/Time", "Value"])
+
+
+register("iBottun", _header_detector("Date/Time,Unit,Value"), _read_ibutton)
+register("nanotag", _header_detector("日時,振動数(積分値),SE,温度(平均値),SE,,"), _read_nanotag)
+register("arco", _detect_arco, _read_arco)
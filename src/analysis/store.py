@@ -0,0 +1,119 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from analysis import cache
+from setting import (
+    DATASET_CACHE_DIR_PATH,
+    DATASET_CACHE_DISK_BYTES,
+    DATASET_CACHE_ENABLED,
+)
+
+# Changing the parsing of the data files invalidates the old entries
+STORE_VERSION = 3
+
+
+def file_key(file_path: str) -> str:
+    """
+    Computes the content hash of an uploaded data file,
+    so that the same recording is found regardless of its file name.
+
+    Args:
+        file_path (str): The path of the data file.
+    Returns:
+        str: The hexadecimal hash, or None if the cache is turned off.
+    """
+    if not DATASET_CACHE_ENABLED:
+        return None
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{STORE_VERSION}:".encode())
+    with open(file_path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _store_paths(key: str) -> tuple:
+    """
+    Returns the paths of the time and temperature arrays of a key.
+
+    Args:
+        key (str): The content hash.
+    Returns:
+        tuple: The paths of the time and temperature arrays.
+    """
+    return (
+        os.path.join(DATASET_CACHE_DIR_PATH, f"{key}.time.npy"),
+        os.path.join(DATASET_CACHE_DIR_PATH, f"{key}.tb.npy"),
+    )
+
+
+def load(key: str) -> pd.DataFrame:
+    """
+    Loads the parsed data of a file from the cache. The arrays are memory-mapped
+    and the DataFrame is built on them without a copy, so that only the pages
+    actually read are loaded into memory.
+
+    Args:
+        key (str): The content hash.
+    Returns:
+        pandas.DataFrame: The date/time (datetime64[s]) and temperature (float64)
+        data, or None if the data is not cached.
+    """
+    if key is None:
+        return None
+    paths = _store_paths(key)
+    try:
+        time = np.load(paths[0], mmap_mode="r")
+        tb = np.load(paths[1], mmap_mode="r")
+        if time.dtype != np.int64 or tb.dtype != np.float64 or len(time) != len(tb):
+            raise ValueError("Unexpected arrays.")
+        # the modification time orders the entries for the eviction
+        for path in paths:
+            os.utime(path)
+    except FileNotFoundError:
+        # either array may be evicted
+        return None
+    except Exception as e:
+        print(f"Broken dataset entry {key}: {str(e)}")
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+        return None
+    return pd.DataFrame(
+        {"Date/Time": time.view("datetime64[s]"), "Value": tb}, copy=False
+    )
+
+
+def save(key: str, df: pd.DataFrame) -> bool:
+    """
+    Stores the parsed data of a file as the int64 epoch seconds and the float64
+    temperatures, and evicts the least recently used arrays exceeding
+    DATASET_CACHE_DISK_BYTES.
+
+    Args:
+        key (str): The content hash.
+        df (pandas.DataFrame): The date/time and temperature data.
+    Returns:
+        bool: Whether the data is stored.
+    """
+    if key is None:
+        return False
+    arrays = [
+        df["Date/Time"].to_numpy(dtype="datetime64[s]").view(np.int64),
+        df["Value"].to_numpy(dtype=np.float64),
+    ]
+    try:
+        os.makedirs(DATASET_CACHE_DIR_PATH, exist_ok=True)
+        for path, array in zip(_store_paths(key), arrays):
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as f:
+                np.save(f, array)
+            os.replace(temp_path, path)
+        cache.evict_disk(DATASET_CACHE_DIR_PATH, DATASET_CACHE_DISK_BYTES, ".npy")
+    except OSError as e:
+        print(f"Failed to write dataset entry {key}: {str(e)}")
+        return False
+    return True
@@ -0,0 +1,159 @@
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+from setting import TIMING_ENABLED
+
+# Whether the stages are timed
+_enabled = TIMING_ENABLED
+# The records of the running stages, innermost last
+_active = []
+# The lists collecting the records of the finished stages, innermost last
+_collections = []
+
+_NULL_STAGE = nullcontext()
+
+
+def enable(enabled: bool = True) -> None:
+    """
+    Turns the timing of the stages on or off.
+
+    Args:
+        enabled (bool): Whether the stages are timed.
+    """
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    """
+    Returns whether the stages are timed.
+
+    Returns:
+        bool: True if the stages are timed, False otherwise.
+    """
+    return _enabled
+
+
+def stage(name: str, **labels):
+    """
+    Returns a context manager timing the block as a stage of the pipeline.
+    The record of the stage is logged and collected when the block ends.
+    The labels (e.g., the file name) are inherited by the stages inside the block.
+    When the timing is turned off, a shared no-op context manager is returned.
+
+    Args:
+        name (str): The name of the stage.
+        **labels: The labels of the record.
+    Returns:
+        contextlib.AbstractContextManager: The context manager yielding the record
+        of the stage, or None when the timing is turned off.
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    return _timed_stage(name, labels)
+
+
+@contextmanager
+def _timed_stage(name: str, labels: dict):
+    """
+    Times the block and stores the record of the stage.
+
+    Args:
+        name (str): The name of the stage.
+        labels (dict): The labels of the record.
+    """
+    parent = _active[-1] if _active else None
+    if parent is not None:
+        labels = parent["labels"] | labels
+    record = {
+        "stage": name,
+        "parent": None if parent is None else parent["stage"],
+        "labels": labels,
+        "seconds": None,
+        "counters": {},
+    }
+    _active.append(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = time.perf_counter() - start
+        _active.pop()
+        print(f"timing: {json.dumps(record, default=str)}")
+        if _collections:
+            _collections[-1].append(record)
+
+
+def count(name: str, value: int = 1) -> None:
+    """
+    Adds a value to a counter of the innermost running stage.
+
+    Args:
+        name (str): The name of the counter.
+        value (int): The value to be added.
+    """
+    if _enabled and _active:
+        counters = _active[-1]["counters"]
+        counters[name] = counters.get(name, 0) + int(value)
+
+
+@contextmanager
+def collecting(enabled: bool = None):
+    """
+    Collects the records of the stages finished in the block.
+    The records are not passed to the enclosing collection automatically,
+    so that the records returned from worker processes are merged in the same way
+    with extend.
+
+    Args:
+        enabled (bool): Whether the stages are timed in the block.
+        If None, the current setting is kept.
+    Yields:
+        list: The records of the finished stages.
+    """
+    global _enabled
+    previous = _enabled
+    if enabled is not None:
+        _enabled = enabled
+    records = []
+    _collections.append(records)
+    try:
+        yield records
+    finally:
+        _collections.pop()
+        _enabled = previous
+
+
+def extend(records: list) -> None:
+    """
+    Adds the records collected elsewhere (e.g., in a worker process)
+    to the innermost collection.
+
+    Args:
+        records (list): The records of the finished stages.
+    """
+    if _collections:
+        _collections[-1].extend(records)
+
+
+def summarize(records: list) -> list:
+    """
+    Sums up the time and the counters of the records by the stage.
+
+    Args:
+        records (list): The records of the finished stages.
+    Returns:
+        list: The total of each stage in the order of first appearance.
+    """
+    summary = {}
+    for record in records:
+        total = summary.setdefault(
+            record["stage"],
+            {"stage": record["stage"], "calls": 0, "seconds": 0.0, "counters": {}},
+        )
+        total["calls"] += 1
+        total["seconds"] += record["seconds"]
+        for name, value in record["counters"].items():
+            total["counters"][name] = total["counters"].get(name, 0) + value
+    return list(summary.values())
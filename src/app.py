@@ -2,8 +2,13 @@ import traceback
 from flask import Flask, render_template, request, send_file, session
 from pandas.errors import EmptyDataError
 
-from analysis import categorizer, filer
-from setting import SESSION_LIMIT_TIME
+from analysis import categorizer, filer, timing
+from setting import (
+    ANALYZE_SEASONS,
+    RESAMPLE_BEFORE_ANALYSIS,
+    RESAMPLE_MAX_GAP,
+    SESSION_LIMIT_TIME,
+)
 
 app = Flask(__name__, static_folder="static")
 app.secret_key = 'secretkey'
@@ -143,64 +148,50 @@ def preview_params():
 # Analyze data page
 @app.route("/analyze", methods=["POST"])
 def analysis():
+    # the records of the timed stages are shown with the analysis summary
+    with timing.collecting() as timings:
+        return _analysis(timings)
+
+
+def _analysis(timings: list):
     files = session.get("files", [])
     data, _ = filer.data_format(files)
+    with timing.stage("check_sampling"):
+        data, _ = categorizer.check_sampling(
+            data, RESAMPLE_BEFORE_ANALYSIS, RESAMPLE_MAX_GAP
+        )
     session["folder_name"], folder_path = filer.create_unique_dir(
         request.form.get("folder_name")
     )
     
-    # Get the Y-axis scale setting
-    scale_mode = request.form.get("scale_mode", "unified")
-    y_range = None
-    
-    if scale_mode == "custom":
-        try:
-            y_min = float(request.form.get("y_min", 0))
-            y_max = float(request.form.get("y_max", 40))
-            if y_min >= y_max:
-                raise ValueError("Invalid range")
-            y_range = (y_min, y_max)
-        except (ValueError, TypeError):
-            scale_mode = "unified"
-            y_range = None
-
-    if scale_mode == "unified" and y_range is None:
-        # 全データから統一範囲を計算
-        y_min, y_max = filer.calculate_optimal_y_range(data)
-        y_range = (y_min, y_max)
+    scale_mode, y_range = _y_scale(data)
 
     try:
         if request.form.getlist("param"):
             parameters_dict = filer.pick_up_parameter(
                 files,
-                request.form.getlist("param")
+                request.form.getlist("param"),
+                list(zip(
+                    request.form.getlist("exclusion_start_time"),
+                    request.form.getlist("exclusion_end_time")
+                ))
             )
         else:
             parameters_dict = filer.read_parameters()
         
-        event_set, div_set = {}, {}
-        
         # First save the raw data plot at a uniform scale
         if scale_mode != "auto":
             filer.save_figures_with_scale(data, y_range, scale_mode)
         else:
             filer.save_figures(data)
         
-        for file in files:
-            if file in parameters_dict.keys():
-                peaks = categorizer.analyze(parameters_dict[file], data[file])
-                filer.save_artifacts(folder_path, file, peaks)
-                
-                # Event color-coded diagrams can also be generated with scale control
-                div_set |= filer.plot_coloring_events_with_scale(
-                    file,
-                    folder_path,
-                    data[file],
-                    peaks,
-                    y_range,
-                    scale_mode
-                )
-                event_set |= {file: filer.output(peaks)}
+        with timing.stage("analyze_many"):
+            results, errors = categorizer.analyze_many(
+                parameters_dict, data, seasons=ANALYZE_SEASONS
+            )
+        event_set, div_set = _save_results(
+            results, data, folder_path, y_range, scale_mode
+        )
         
         session['scale_settings'] = {
             'mode': scale_mode,
@@ -211,6 +202,8 @@ def analysis():
             "analysis.html", 
             divs=div_set, 
             summary=event_set,
+            errors=errors,
+            timings=timing.summarize(timings),
             scale_info=f"Charts generated with {scale_mode} scale" + 
                       (f" ({y_range[0]}°C to {y_range[1]}°C)" if y_range else "")
         )
@@ -230,6 +223,62 @@ def analysis():
         )
 
 
+# Get the Y-axis scale setting
+def _y_scale(data: dict):
+    scale_mode = request.form.get("scale_mode", "unified")
+    y_range = None
+
+    if scale_mode == "custom":
+        try:
+            y_min = float(request.form.get("y_min", 0))
+            y_max = float(request.form.get("y_max", 40))
+            if y_min >= y_max:
+                raise ValueError("Invalid range")
+            y_range = (y_min, y_max)
+        except (ValueError, TypeError):
+            scale_mode = "unified"
+            y_range = None
+
+    if scale_mode == "unified" and y_range is None:
+        # 全データから統一範囲を計算
+        y_min, y_max = filer.calculate_optimal_y_range(data)
+        y_range = (y_min, y_max)
+    return scale_mode, y_range
+
+
+# Saves the artifacts and the charts of each analyzed file
+def _save_results(
+        results: dict,
+        data: dict,
+        folder_path: str,
+        y_range,
+        scale_mode: str):
+    event_set, div_set = {}, {}
+    for file, seasons in results.items():
+        if not ANALYZE_SEASONS:
+            seasons = [seasons]
+        for peaks in seasons:
+            # Each season is saved and plotted as a file of its own
+            name = file
+            if ANALYZE_SEASONS:
+                name = file.replace(".csv", f"_season{peaks['season']}.csv")
+            with timing.stage("save_artifacts", file=name):
+                filer.save_artifacts(folder_path, name, peaks)
+
+            # Event color-coded diagrams can also be generated with scale control
+            with timing.stage("plot_coloring_events", file=name):
+                div_set |= filer.plot_coloring_events_with_scale(
+                    name,
+                    folder_path,
+                    data[file],
+                    peaks,
+                    y_range,
+                    scale_mode
+                )
+            event_set |= {name: filer.output(peaks)}
+    return event_set, div_set
+
+
 @app.route("/downloads", methods=["GET", "POST"])
 @app.route("/downloads/<path:file_name>", methods=["GET", "POST"])
 def download_artifacts(file_name=None):
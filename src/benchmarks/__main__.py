@@ -0,0 +1,204 @@
+"""
+Times the analysis, the data loading, the artifact saving and the plotting on
+synthetic recordings and writes the results as JSON.
+
+Run from the src directory:
+    python -m benchmarks --intervals 10 60 --days 30 365 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+import traceback
+
+import numpy as np
+import pandas as pd
+
+from analysis import categorizer, filer
+from benchmarks.generator import (
+    ENDS, generate_parameters, generate_recording, write_ibutton_csv
+)
+from setting import DATA_DIR_PATH
+
+INTERVALS = [1, 5, 10, 60]
+DAYS = [30, 365, 1095]
+STAGES = ["analyze", "data_format", "save_artifacts", "plot"]
+
+
+def _timed(func, repeat: int, *args, **kwargs) -> tuple:
+    """
+    Calls a function repeatedly and measures the elapsed time of each call.
+
+    Args:
+        func (callable): The function to be timed.
+        repeat (int): The number of calls.
+        *args: The positional arguments of the function.
+        **kwargs: The keyword arguments of the function.
+    Returns:
+        tuple: The timing record and the return value of the last call.
+    """
+    seconds, result = [], None
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            seconds.append(time.perf_counter() - start)
+    except Exception as e:
+        print(traceback.format_exc())
+        return {"seconds": seconds, "best": None, "error": str(e)}, None
+    return {"seconds": seconds, "best": min(seconds), "error": None}, result
+
+
+def run_case(
+        days: int,
+        interval: int,
+        end: str,
+        stages: list,
+        engines: list,
+        repeat: int = 1,
+        seed: int = 0) -> list:
+    """
+    Times the stages on one synthetic recording.
+    It must be called in a working directory created by filer.mkdirs.
+
+    Args:
+        days (int): The duration of the recording in days.
+        interval (int): The sampling interval in minutes.
+        end (str): How the recording ends ("refractoriness", "dead" or "removal").
+        stages (list): The stages to be timed.
+        engines (list): The analysis engines to be timed.
+        repeat (int): The number of calls of each stage.
+        seed (int): The seed of the generator.
+    Returns:
+        list: The timing record of each stage.
+    """
+    data = generate_recording(days, interval, end, seed)
+    params = generate_parameters(data, interval)
+    file = f"synthetic_{days}d_{interval}min_{end}.csv"
+    case = {"days": days, "interval": interval, "end": end, "samples": len(data)}
+
+    records = []
+    if "data_format" in stages:
+        write_ibutton_csv(data, os.path.join(DATA_DIR_PATH, file))
+        # the dataset store would turn the repeated calls into loads
+        record, _ = _timed(filer.data_format, repeat, [file], use_store=False)
+        records.append(case | {"stage": "data_format"} | record)
+
+    # the results of the first engine are saved and plotted
+    results = None
+    for engine in engines if "analyze" in stages else engines[:1]:
+        # the result cache would turn the repeated calls into lookups
+        record, res = _timed(
+            categorizer.analyze, repeat, params, data, engine, use_cache=False
+        )
+        if "analyze" in stages:
+            records.append(case | {"stage": f"analyze[{engine}]"} | record)
+        if results is None:
+            results = res
+
+    if results is None:
+        return records
+    if "save_artifacts" in stages:
+        _, folder_path = filer.create_unique_dir(file.replace(".csv", ""))
+        record, _ = _timed(filer.save_artifacts, repeat, folder_path, file, results)
+        records.append(case | {"stage": "save_artifacts"} | record)
+    if "plot" in stages:
+        data_list = {file: data}
+        y_range = filer.calculate_optimal_y_range(data_list)
+        _, folder_path = filer.create_unique_dir(file.replace(".csv", "_plot"))
+        plots = {
+            "save_figures": (filer.save_figures, (data_list,)),
+            "save_figures_with_scale": (
+                filer.save_figures_with_scale, (data_list, y_range, "unified")
+            ),
+            "plot_coloring_events_with_scale": (
+                filer.plot_coloring_events_with_scale,
+                (file, folder_path, data, results, y_range, "unified"),
+            ),
+        }
+        for stage, (func, args) in plots.items():
+            record, _ = _timed(func, repeat, *args)
+            records.append(case | {"stage": stage} | record)
+    return records
+
+
+def run(
+        days_list: list,
+        intervals: list,
+        ends: list,
+        stages: list,
+        engines: list,
+        repeat: int = 1,
+        seed: int = 0) -> dict:
+    """
+    Times the stages on every combination of the durations, the intervals and
+    the ends of the recordings in a temporary working directory.
+
+    Args:
+        days_list (list): The durations of the recordings in days.
+        intervals (list): The sampling intervals in minutes.
+        ends (list): How the recordings end.
+        stages (list): The stages to be timed.
+        engines (list): The analysis engines to be timed.
+        repeat (int): The number of calls of each stage.
+        seed (int): The seed of the generator.
+    Returns:
+        dict: The environment and the timing records.
+    """
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+        },
+        "results": [],
+    }
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        try:
+            filer.mkdirs()
+            for days in days_list:
+                for interval in intervals:
+                    for end in ends:
+                        print(f"benchmark: {days} days, {interval} min, {end}")
+                        report["results"] += run_case(
+                            days, interval, end, stages, engines, repeat, seed
+                        )
+        finally:
+            os.chdir(cwd)
+    return report
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Times the analysis pipeline on synthetic recordings.",
+    )
+    parser.add_argument("--days", type=int, nargs="+", default=DAYS)
+    parser.add_argument("--intervals", type=int, nargs="+", default=INTERVALS)
+    parser.add_argument("--ends", nargs="+", choices=ENDS, default=ENDS)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument(
+        "--engines", nargs="+", choices=list(categorizer.ENGINES), default=["loop"]
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args(argv)
+
+    output = os.path.abspath(args.output)
+    report = run(
+        args.days, args.intervals, args.ends, args.stages, args.engines,
+        args.repeat, args.seed,
+    )
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"benchmark results are saved in {output}")
+
+
+if __name__ == "__main__":
+    main()
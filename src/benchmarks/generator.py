@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+
+# The recording starts in autumn, before the hibernation season
+START_TIME = np.datetime64("2023-09-01T00:00:00", "s")
+ENDS = ["refractoriness", "dead", "removal"]
+
+EUTHERMIC_TMP = 37.0
+AMBIENT_TMP = 5.0
+ROOM_TMP = 22.0
+# The resolution of the temperature loggers (e.g., iButton DS1922L)
+RESOLUTION = 0.0625
+
+
+def _euthermia(rng: np.random.Generator, minutes: int, low_tb: bool = False):
+    """
+    Generates the body temperature of the euthermic state with a daily rhythm.
+
+    Args:
+        rng (numpy.random.Generator): The random number generator.
+        minutes (int): The duration in minutes.
+        low_tb (bool): Whether to add short low Tb events of the pre-hibernation
+        period.
+    Returns:
+        numpy.ndarray: The body temperature of each minute.
+    """
+    t = np.arange(minutes)
+    tmp = EUTHERMIC_TMP + 0.6 * np.sin(2 * np.pi * t / 1440)
+    tmp += rng.normal(0, 0.15, minutes)
+    if low_tb:
+        # about two low Tb events a week lasting 30 to 90 minutes
+        for start in rng.integers(0, max(1, minutes - 90), minutes // 5040):
+            length = int(rng.integers(30, 90))
+            level = rng.uniform(33.3, 33.8)
+            tmp[start:start + length] = level + rng.normal(0, 0.05, length)
+    return tmp
+
+
+def _torpor_bout(rng: np.random.Generator, shallow: bool = False):
+    """
+    Generates the body temperature of a torpor bout: cooling, deep (or shallow)
+    torpor, rewarming and the following interbout arousal.
+
+    Args:
+        rng (numpy.random.Generator): The random number generator.
+        shallow (bool): Whether the torpor is shallow and short.
+    Returns:
+        numpy.ndarray: The body temperature of each minute.
+    """
+    if shallow:
+        floor = rng.uniform(20, 28)
+        torpor_minutes = int(rng.integers(4 * 60, 10 * 60))
+    else:
+        floor = AMBIENT_TMP + rng.uniform(0.5, 1.5)
+        torpor_minutes = int(rng.integers(2 * 1440, 5 * 1440))
+    cooling = floor + (EUTHERMIC_TMP - floor) * np.exp(-np.arange(8 * 60) / 90)
+    torpor = floor + rng.normal(0, 0.1, torpor_minutes)
+    rewarming = floor + (EUTHERMIC_TMP - floor) / (
+        1 + np.exp(-(np.arange(2 * 60) - 60) / 12)
+    )
+    arousal = _euthermia(rng, int(rng.integers(12 * 60, 24 * 60)))
+    return np.concatenate([cooling, torpor, rewarming, arousal])
+
+
+def _hibernation(rng: np.random.Generator, minutes: int, end: str):
+    """
+    Generates the body temperature of a hibernation period of torpor bouts
+    with periodic arousals, ended by death or logger removal if specified.
+
+    Args:
+        rng (numpy.random.Generator): The random number generator.
+        minutes (int): The duration in minutes.
+        end (str): How the recording ends ("refractoriness", "dead" or "removal").
+    Returns:
+        numpy.ndarray: The body temperature of each minute.
+    """
+    bout_minutes = int(minutes * 0.8) if end in ["dead", "removal"] else minutes
+    bouts, length = [], 0
+    while length < bout_minutes:
+        bouts.append(_torpor_bout(rng, shallow=rng.random() < 0.1))
+        length += len(bouts[-1])
+    tmp = np.concatenate(bouts)[:bout_minutes]
+
+    rest = minutes - bout_minutes
+    if end == "dead":
+        last = tmp[-1] if len(tmp) > 0 else EUTHERMIC_TMP
+        cooling = AMBIENT_TMP + (last - AMBIENT_TMP) * np.exp(-np.arange(rest) / 180)
+        tmp = np.concatenate([tmp, cooling + rng.normal(0, 0.05, rest)])
+    elif end == "removal":
+        tmp = np.concatenate([tmp, ROOM_TMP + rng.normal(0, 0.3, rest)])
+    return tmp
+
+
+def generate_recording(
+        days: int,
+        interval: int = 1,
+        end: str = "refractoriness",
+        seed: int = 0) -> pd.DataFrame:
+    """
+    Generates a deterministic synthetic body temperature recording of
+    a hibernating animal. Each year consists of the pre-hibernation period with
+    low Tb events, the hibernation period of torpor bouts with periodic arousals,
+    and the post-hibernation period. The last hibernation period ends as specified.
+    The same seed gives the same animal at every interval.
+
+    Args:
+        days (int): The duration of the recording in days.
+        interval (int): The sampling interval in minutes.
+        end (str): How the recording ends ("refractoriness", "dead" or "removal").
+        seed (int): The seed of the random number generator.
+    Returns:
+        pandas.DataFrame: The recording with "Date/Time" and "Value" columns.
+    """
+    if end not in ENDS:
+        raise ValueError(f"Unknown end of recording: {end}")
+    rng = np.random.default_rng(seed)
+    minutes = days * 1440
+    seasons = []
+    for season_start in range(0, minutes, 365 * 1440):
+        season_minutes = min(365 * 1440, minutes - season_start)
+        last = season_start + season_minutes == minutes
+        prehib = int(season_minutes * 0.3)
+        hibernation = int(season_minutes * 0.55)
+        if last and end != "refractoriness":
+            hibernation = season_minutes - prehib
+        seasons += [
+            _euthermia(rng, prehib, low_tb=True),
+            _hibernation(rng, hibernation, end if last else "refractoriness"),
+            _euthermia(rng, season_minutes - prehib - hibernation),
+        ]
+        if last and end != "refractoriness":
+            break
+    tmp = np.concatenate(seasons)[::interval]
+    tmp = np.round(tmp / RESOLUTION) * RESOLUTION
+    time = START_TIME + np.arange(len(tmp)) * np.timedelta64(interval * 60, "s")
+    return pd.DataFrame({"Date/Time": time, "Value": tmp})
+
+
+def generate_parameters(data: pd.DataFrame, interval: int = 1) -> dict:
+    """
+    Generates the parameter set of a synthetic recording with the default values
+    of the parameter input page.
+
+    Args:
+        data (pandas.DataFrame): The synthetic recording.
+        interval (int): The sampling interval in minutes.
+    Returns:
+        dict: The parameter set in the format of the parameter file.
+    """
+    return {
+        "ID": "synthetic",
+        "group": "benchmark",
+        "prehib_start_time": str(data["Date/Time"].iloc[0]),
+        "hib_end_time": np.nan,
+        "hib_start_tmp": 33,
+        "upper_threshold": 33,
+        "lower_threshold": 10,
+        "prehib_low_Tb_threshold": 34,
+        "hib_start_discrimination": interval,
+        "hib_end_discrimination": 20160,
+        "dead_discrimination": 10080,
+        "refractoryness_discrimination": 60,
+        "pa_discrimination": interval,
+        "exclusion_start_time": np.nan,
+        "exclusion_end_time": np.nan,
+    }
+
+
+def write_ibutton_csv(data: pd.DataFrame, file_path: str) -> None:
+    """
+    Writes a synthetic recording as a CSV file exported from an iButton logger,
+    with a two-digit year as the loggers do.
+
+    Args:
+        data (pandas.DataFrame): The synthetic recording.
+        file_path (str): The path of the CSV file.
+    """
+    time = pd.Series(data["Date/Time"]).dt.strftime("%y/%m/%d %H:%M:%S")
+    with open(file_path, "w", encoding="Shift-JIS") as f:
+        f.write("1-Wire/iButton Part Number: DS1922L\n")
+        f.write("Mission Start: " + time.iloc[0] + "\n")
+        f.write("\n")
+        f.write("Date/Time,Unit,Value\n")
+        pd.DataFrame(
+            {"Date/Time": time, "Unit": "C", "Value": data["Value"]}
+        ).to_csv(f, header=False, index=False, lineterminator="\n")
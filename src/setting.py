@@ -7,3 +7,38 @@ ARTIFACTS_DIR_PATH = 'artifacts/'
 TRASH_DIR_PATH = 'trash'
 
 SESSION_LIMIT_TIME = timedelta(minutes=120)
+
+# The number of worker processes of the analysis (None: DEFAULT_MAX_WORKERS)
+ANALYSIS_MAX_WORKERS = None
+# The number of worker processes parsing the data files (None: DEFAULT_MAX_WORKERS)
+DATA_FORMAT_MAX_WORKERS = None
+# The number of worker processes when it is not set, up to the number of CPUs,
+# since each request starts a process pool of its own
+DEFAULT_MAX_WORKERS = 4
+
+# Whether to resample the data to a regular time grid before the analysis
+RESAMPLE_BEFORE_ANALYSIS = False
+# The longest gap in seconds interpolated by the resampling (None: every gap)
+RESAMPLE_MAX_GAP = None
+
+# Whether every hibernation season of a multi-year recording is analyzed,
+# each season being saved and plotted as a file of its own
+ANALYZE_SEASONS = False
+
+# Whether the stages of the analysis pipeline are timed and logged
+TIMING_ENABLED = False
+
+# Whether the analysis results are cached by the content of the data and parameters
+RESULT_CACHE_ENABLED = True
+# The directory of the on-disk cache, skipped by the cleanup of old artifacts
+RESULT_CACHE_DIR_PATH = 'artifacts/.cache/'
+# The sizes of the in-memory and on-disk caches in bytes
+RESULT_CACHE_MEMORY_BYTES = 64 * 1024 * 1024
+RESULT_CACHE_DISK_BYTES = 512 * 1024 * 1024
+
+# Whether the parsed data files are cached by their content
+DATASET_CACHE_ENABLED = True
+# The directory of the parsed data, skipped by the cleanup of old artifacts
+DATASET_CACHE_DIR_PATH = 'artifacts/.datasets/'
+# The size of the parsed data cache in bytes
+DATASET_CACHE_DISK_BYTES = 1024 * 1024 * 1024
@@ -0,0 +1,129 @@
+"""
+Checks that the vectorized engine and the incremental analysis give the same
+results as the loop engine on synthetic recordings.
+
+Run from the src directory:
+    python -m unittest discover tests
+"""
+import unittest
+
+import numpy as np
+
+from analysis import categorizer
+from benchmarks.generator import ENDS, generate_parameters, generate_recording
+
+# The durations in days and the sampling intervals in minutes of the recordings
+RECORDINGS = [(60, 10), (200, 30)]
+# Every n-th sample of the recordings with missing data has no temperature
+MISSING_EVERY = 97
+# The number of samples appended at once to the incremental analysis
+CHUNK_SIZE = 500
+
+
+def _cases(missing: bool = False, exclusion: bool = False):
+    """
+    Generates the synthetic recordings and their parameter sets.
+
+    Args:
+        missing (bool): Whether some samples have no temperature.
+        exclusion (bool): Whether two exclusion periods are set.
+    Yields:
+        tuple: The name of the case, the recording and the parameter set.
+    """
+    for days, interval in RECORDINGS:
+        for end in ENDS:
+            data = generate_recording(days, interval, end)
+            params = generate_parameters(data, interval)
+            if missing:
+                data.loc[::MISSING_EVERY, "Value"] = np.nan
+            if exclusion:
+                time = data["Date/Time"].astype(str)
+                n = len(data)
+                params["exclusion_start_time"] = [time[n // 3], time[n // 2]]
+                params["exclusion_end_time"] = [time[n // 3 + 50], time[n // 2 + 200]]
+            yield f"{days}d_{interval}min_{end}", data, params
+
+
+def _stream(params: dict, data, chunk_sizes: list) -> tuple:
+    """
+    Analyzes a recording received in chunks with the incremental analysis.
+
+    Args:
+        params (dict): The parameter set.
+        data (pandas.DataFrame): The recording.
+        chunk_sizes (list): The sizes of the first chunks, after which
+        the chunks have CHUNK_SIZE samples.
+    Returns:
+        tuple: The emitted event tables and the results of close().
+    """
+    analyzer = categorizer.IncrementalAnalyzer(params)
+    tmp, time = data["Value"].values, data["Date/Time"].values
+    bounds = np.cumsum(chunk_sizes).tolist()
+    bounds += list(range(bounds[-1] if bounds else 0, len(tmp), CHUNK_SIZE))[1:]
+    emitted = [
+        analyzer.update(tmp[start:end], time[start:end])
+        for start, end in zip([0] + bounds, bounds + [len(tmp)])
+    ]
+    return emitted, analyzer.close()
+
+
+class EngineTest(unittest.TestCase):
+
+    def assert_same_results(self, expected: dict, actual: dict) -> None:
+        for key in ["status", "hib_start_idx", "hib_end_idx"]:
+            self.assertEqual(expected[key], actual[key], key)
+        self.assertEqual(expected["events"].tolist(), actual["events"].tolist())
+        for key in ["excluded", "skipped"]:
+            np.testing.assert_array_equal(
+                expected["data"][key], actual["data"][key], key
+            )
+
+    def assert_engines_agree(self, **case) -> None:
+        for name, data, params in _cases(**case):
+            with self.subTest(name):
+                self.assert_same_results(
+                    categorizer.analyze(params, data, "loop", use_cache=False),
+                    categorizer.analyze(params, data, "vectorized", use_cache=False),
+                )
+
+    def test_vectorized_engine(self):
+        self.assert_engines_agree()
+
+    def test_vectorized_engine_with_missing_data(self):
+        self.assert_engines_agree(missing=True)
+
+    def test_vectorized_engine_with_exclusion(self):
+        self.assert_engines_agree(missing=True, exclusion=True)
+
+    def test_incremental_analyzer(self):
+        for name, data, params in _cases(missing=True, exclusion=True):
+            with self.subTest(name):
+                emitted, results = _stream(params, data, [])
+                self.assert_same_results(
+                    categorizer.analyze(params, data, use_cache=False), results
+                )
+                # the emitted events are final, except for the PA and ST events
+                # merged by close()
+                emitted = np.concatenate(emitted)
+                merged = np.isin(
+                    emitted["event_code"],
+                    [categorizer.EVENT_NAMES.index(event) for event in ["PA", "ST"]],
+                )
+                self.assertLessEqual(
+                    set(emitted[~merged].tolist()), set(results["events"].tolist())
+                )
+
+    def test_incremental_analyzer_with_gap_at_start(self):
+        # the interval of the first two samples is not the interval
+        # of the recording
+        for name, data, params in _cases():
+            with self.subTest(name):
+                data = data.drop(index=data.index[1:3]).reset_index(drop=True)
+                _, results = _stream(params, data, [2])
+                self.assert_same_results(
+                    categorizer.analyze(params, data, use_cache=False), results
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
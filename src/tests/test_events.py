@@ -0,0 +1,111 @@
+"""
+Checks the events exported by the analysis against the events of the original
+per-sample analysis loop.
+
+Run from the src directory:
+    python -m unittest discover tests
+"""
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analysis import categorizer
+
+START_TIME = np.datetime64("2023-11-01T00:00:00", "s")
+# An hourly recording: the pre-hibernation, a deep torpor with a missing sample
+# and an exclusion period, a rewarming, a missing sample in the in-band samples
+# before the hibernation end, and the post-hibernation with a missing sample
+TMP = (
+    [32.0] * 5
+    + [8.0, 8.0, 8.0, np.nan, 8.0, 8.0, 8.0, 8.0, 8.0, 8.0]
+    + [20.0, 37.0, np.nan, 20.0, 20.0, 20.0]
+    + [37.0] * 4 + [np.nan] + [37.0] * 9
+)
+PARAMETERS = {
+    "ID": "A",
+    "group": "test",
+    "prehib_start_time": str(START_TIME),
+    "hib_end_time": np.nan,
+    "hib_start_tmp": 30,
+    "upper_threshold": 33,
+    "lower_threshold": 10,
+    "prehib_low_Tb_threshold": 34,
+    "hib_start_discrimination": 120,
+    "hib_end_discrimination": 600,
+    "dead_discrimination": 6000,
+    "refractoryness_discrimination": 180,
+    "pa_discrimination": 60,
+    "exclusion_start_time": [str(START_TIME + np.timedelta64(10, "h"))],
+    "exclusion_end_time": [str(START_TIME + np.timedelta64(11, "h"))],
+}
+# The samples of each event given by the original loop, with None in place of
+# the excluded samples. The missing samples up to the hibernation end (8 and 17),
+# the sample after the exclusion period (12) and the sample where
+# the hibernation end is detected (21) are left out.
+EXPECTED_EVENTS = {
+    "prehib": [[0, 1, 2, 3, 4]],
+    "DT": [[5, 6, 7, 9, None, None, 13, 14]],
+    "Rewarming": [[15]],
+    "posthib": [[16, 18, 19, 20] + list(range(22, 34))] * 12,
+}
+
+
+def _recording() -> pd.DataFrame:
+    """
+    Builds the recording of the test.
+
+    Returns:
+        pandas.DataFrame: The recording.
+    """
+    return pd.DataFrame({
+        "Date/Time": START_TIME + np.arange(len(TMP)) * np.timedelta64(1, "h"),
+        "Value": TMP,
+    })
+
+
+class EventTest(unittest.TestCase):
+
+    def test_events_of_original_loop(self):
+        data = _recording()
+        tmp = np.append(data["Value"].values, np.nan)
+        time = np.append(data["Date/Time"].values, np.datetime64("NaT"))
+        for engine in categorizer.ENGINES:
+            with self.subTest(engine):
+                results = categorizer.analyze(
+                    PARAMETERS, data, engine, use_cache=False
+                )
+                self.assertEqual(results["status"], "Refractoriness")
+                self.assertEqual(results["hib_end_idx"], 20)
+                for name in categorizer.EVENT_NAMES:
+                    expected = EXPECTED_EVENTS.get(name, [])
+                    self.assertEqual(len(results["tmp"][name]), len(expected), name)
+                    for num, indices in enumerate(expected, 1):
+                        # the excluded samples are NaN (NaT)
+                        positions = [len(data) if i is None else i for i in indices]
+                        np.testing.assert_array_equal(
+                            results["tmp"][name][num], tmp[positions], name
+                        )
+                        np.testing.assert_array_equal(
+                            results["time"][name][num], time[positions], name
+                        )
+
+    def test_events_of_one_season(self):
+        data = _recording()
+        for engine in categorizer.ENGINES:
+            with self.subTest(engine):
+                results = categorizer.analyze(
+                    PARAMETERS, data, engine, use_cache=False
+                )
+                seasons = categorizer.analyze_seasons(
+                    PARAMETERS, data, engine, use_cache=False
+                )
+                self.assertEqual(len(seasons), 1)
+                self.assertEqual(seasons[0]["status"], results["status"])
+                self.assertEqual(
+                    seasons[0]["events"].tolist(), results["events"].tolist()
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()